@@ -4,8 +4,11 @@ Simplified 2-button interface with automatic 24/7 monitoring
 Uses MA7/MA25 crossover strategy with TradingView 10-indicator confirmation
 """
 import asyncio
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime, timedelta, timezone
 
 # Mexico/Chiapas timezone (UTC-6)
@@ -19,11 +22,21 @@ from src.binance_client import get_client
 from src.auto_monitor import AutoMonitor
 from src.ml_config import MLConfig
 from src.mtf_analysis import MultiTimeframeAnalyzer, format_mtf_analysis
+from src.ma_strategy import close_async_exchange
 from src.technical_analysis import TechnicalAnalyzer
 from src.auth import AuthManager
 
-# Logging
-logging.basicConfig(level=logging.INFO)
+# Logging: handlers run on a listener thread so log I/O never blocks the event loop
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Global
@@ -32,6 +45,10 @@ auto_monitor = None
 mtf_analyzer = None
 auth_manager = None
 
+# Barras de votos precalculadas por conteo (cada grupo tiene menos de 11 indicadores)
+_LONG_BARS = tuple("🟢" * i for i in range(11))
+_SHORT_BARS = tuple("🔴" * i for i in range(11))
+
 
 def format_price(price: float) -> str:
     """Formatea precio según su magnitud"""
@@ -163,38 +180,40 @@ async def view_monitored_command(update: Update, context: ContextTypes.DEFAULT_T
         bearish_list.sort(key=lambda x: x['score'], reverse=True)
         
         # Build message
-        msg = "┏━━━━━━━━━━━━━━━━━━━━┓\n"
-        msg += "┃  RESUMEN MERCADO   ┃\n"
-        msg += "┗━━━━━━━━━━━━━━━━━━━━┛\n\n"
+        parts = ["┏━━━━━━━━━━━━━━━━━━━━┓\n"]
+        parts.append("┃  RESUMEN MERCADO   ┃\n")
+        parts.append("┗━━━━━━━━━━━━━━━━━━━━┛\n\n")
         
         # TOP 10 BULLISH
-        msg += "🟢 *TOP 10 ALCISTAS*\n"
-        msg += "━━━━━━━━━━━━━━━━━━━━\n"
+        parts.append("🟢 *TOP 10 ALCISTAS*\n")
+        parts.append("━━━━━━━━━━━━━━━━━━━━\n")
         for i, crypto in enumerate(bullish_list[:10], 1):
             votes = crypto['long_votes']
             is_cross = "🔥" if crypto['signal'] == 'LONG' else ""
-            msg += f"{i}. {crypto['name']} ({votes}/10) {is_cross}\n"
+            parts.append(f"{i}. {crypto['name']} ({votes}/10) {is_cross}\n")
         
         if not bullish_list:
-            msg += "No hay señales alcistas fuertes\n"
+            parts.append("No hay señales alcistas fuertes\n")
         
-        msg += "\n"
+        parts.append("\n")
         
         # TOP 10 BEARISH
-        msg += "🔴 *TOP 10 BAJISTAS*\n"
-        msg += "━━━━━━━━━━━━━━━━━━━━\n"
+        parts.append("🔴 *TOP 10 BAJISTAS*\n")
+        parts.append("━━━━━━━━━━━━━━━━━━━━\n")
         for i, crypto in enumerate(bearish_list[:10], 1):
             votes = crypto['short_votes']
             is_cross = "🔥" if crypto['signal'] == 'SHORT' else ""
-            msg += f"{i}. {crypto['name']} ({votes}/10) {is_cross}\n"
+            parts.append(f"{i}. {crypto['name']} ({votes}/10) {is_cross}\n")
         
         if not bearish_list:
-            msg += "No hay señales bajistas fuertes\n"
+            parts.append("No hay señales bajistas fuertes\n")
         
-        msg += "\n"
-        msg += f"⏰ {datetime.now(MEXICO_TZ).strftime('%H:%M:%S')}\n"
-        msg += "🔥 = Cruce reciente\n\n"
-        msg += "┗━━━━━━━━━━━━━━━━━━━━"
+        parts.append("\n")
+        parts.append(f"⏰ {datetime.now(MEXICO_TZ).strftime('%H:%M:%S')}\n")
+        parts.append("🔥 = Cruce reciente\n\n")
+        parts.append("┗━━━━━━━━━━━━━━━━━━━━")
+        
+        msg = ''.join(parts)
         
         keyboard = [[InlineKeyboardButton("← Inicio", callback_data="menu_inicio")]]
         await msg_obj.edit_text(msg, parse_mode=ParseMode.MARKDOWN, reply_markup=InlineKeyboardMarkup(keyboard))
@@ -284,148 +303,149 @@ async def analyze_crypto_command(update: Update, context: ContextTypes.DEFAULT_T
         }
         
         # Format message using new format
-        msg = f"┏━━━━━━━━━━━━━━━━━━━━┓\n"
-        msg += f"┃   {display:^14}   ┃\n"
-        msg += f"┗━━━━━━━━━━━━━━━━━━━━┛\n\n"
+        parts = [f"┏━━━━━━━━━━━━━━━━━━━━┓\n"]
+        parts.append(f"┃   {display:^14}   ┃\n")
+        parts.append(f"┗━━━━━━━━━━━━━━━━━━━━┛\n\n")
         
         # Cripto copiable (usando HTML en lugar de Markdown)
-        msg += f"Cripto: <code>{display}</code>\n\n"
+        parts.append(f"Cripto: <code>{display}</code>\n\n")
         
-        msg += f"💰 Precio: {format_price(price)}\n\n"
+        parts.append(f"💰 Precio: {format_price(price)}\n\n")
         
         # ========== ANÁLISIS MULTI-TIMEFRAME (PRINCIPAL) ==========
-        msg += "━━━ Análisis Multi-Timeframe ━━━\n"
+        parts.append("━━━ Análisis Multi-Timeframe ━━━\n")
         
         # 4H
         if mtf_result.tf_4h:
             trend_icon = "▲" if "ALCISTA" in mtf_result.tf_4h.trend else ("▼" if "BAJISTA" in mtf_result.tf_4h.trend else "▬")
-            msg += f"📊 4H: {trend_icon} {mtf_result.tf_4h.trend}\n"
+            parts.append(f"📊 4H: {trend_icon} {mtf_result.tf_4h.trend}\n")
             if mtf_result.tf_4h.candle_colors:
-                msg += f"   Velas: {mtf_result.tf_4h.candle_colors}\n"
+                parts.append(f"   Velas: {mtf_result.tf_4h.candle_colors}\n")
         
         # 1H
         if mtf_result.tf_1h:
             trend_icon = "▲" if "ALCISTA" in mtf_result.tf_1h.trend else ("▼" if "BAJISTA" in mtf_result.tf_1h.trend else "▬")
-            msg += f"📊 1H: {trend_icon} {mtf_result.tf_1h.trend}\n"
+            parts.append(f"📊 1H: {trend_icon} {mtf_result.tf_1h.trend}\n")
             if mtf_result.tf_1h.candle_colors:
-                msg += f"   Velas: {mtf_result.tf_1h.candle_colors}\n"
+                parts.append(f"   Velas: {mtf_result.tf_1h.candle_colors}\n")
         
         # 15m (KEY CONFIRMATION)
         candle_data = mtf_result.candle_confirmation_15m
         consecutive = max(candle_data.get('consecutive_green', 0), candle_data.get('consecutive_red', 0))
         
         if candle_data.get('trend_change') == 'BULLISH':
-            msg += f"📊 15m: ▲ {consecutive} velas VERDES\n"
+            parts.append(f"📊 15m: ▲ {consecutive} velas VERDES\n")
         elif candle_data.get('trend_change') == 'BEARISH':
-            msg += f"📊 15m: ▼ {consecutive} velas ROJAS\n"
+            parts.append(f"📊 15m: ▼ {consecutive} velas ROJAS\n")
         else:
-            msg += f"📊 15m: ▬ Sin tendencia clara\n"
+            parts.append(f"📊 15m: ▬ Sin tendencia clara\n")
         
         if mtf_result.tf_15m and mtf_result.tf_15m.candle_colors:
-            msg += f"   Velas: {mtf_result.tf_15m.candle_colors}\n"
+            parts.append(f"   Velas: {mtf_result.tf_15m.candle_colors}\n")
         
         if candle_data.get('confirmed', False):
-            msg += f"   ✅ Confirmado (3+ velas)\n"
+            parts.append(f"   ✅ Confirmado (3+ velas)\n")
         elif consecutive > 0:
-            msg += f"   ⏳ Esperando ({consecutive}/3 velas)\n"
+            parts.append(f"   ⏳ Esperando ({consecutive}/3 velas)\n")
         
-        msg += "\n"
+        parts.append("\n")
         
         # ========== INDICADORES TÉCNICOS (15M) - COMPLEMENTARIO ==========
         grouped_votes = mtf_result.grouped_votes
         
-        msg += "━━━ Indicadores (15m) ━━━\n\n"
+        parts.append("━━━ Indicadores (15m) ━━━\n\n")
         
         # OSCILLATORS
         osc = grouped_votes['oscillators']
-        osc_bar = "🟢" * osc['long_count'] + "🔴" * osc['short_count']
-        msg += "📊 Osciladores\n"
-        msg += f"  Venta    Neutral   Compra\n"
-        msg += f"    {osc['short_count']}         {osc['neutral_count']}        {osc['long_count']}\n"
-        msg += f"  \n"
-        msg += f"  {osc_bar} "
+        osc_bar = _LONG_BARS[osc['long_count']] + _SHORT_BARS[osc['short_count']]
+        parts.append("📊 Osciladores\n")
+        parts.append(f"  Venta    Neutral   Compra\n")
+        parts.append(f"    {osc['short_count']}         {osc['neutral_count']}        {osc['long_count']}\n")
+        parts.append(f"  \n")
+        parts.append(f"  {osc_bar} ")
         
         # Oscillator signal label
         if osc['signal'] == 'STRONG_BUY':
-            msg += "Fuerte Compra\n\n"
+            parts.append("Fuerte Compra\n\n")
         elif osc['signal'] == 'BUY':
-            msg += "Compra\n\n"
+            parts.append("Compra\n\n")
         elif osc['signal'] == 'STRONG_SELL':
-            msg += "Fuerte Venta\n\n"
+            parts.append("Fuerte Venta\n\n")
         elif osc['signal'] == 'SELL':
-            msg += "Venta\n\n"
+            parts.append("Venta\n\n")
         else:
-            msg += "Neutral\n\n"
+            parts.append("Neutral\n\n")
         
         # MOVING AVERAGES
         ma = grouped_votes['moving_averages']
-        ma_bar = "🟢" * ma['long_count'] + "🔴" * ma['short_count']
-        msg += "📊 Medias Móviles\n"
-        msg += f"  Venta    Neutral   Compra\n"
-        msg += f"    {ma['short_count']}         {ma['neutral_count']}        {ma['long_count']}\n"
-        msg += f"  \n"
-        msg += f"  {ma_bar} "
+        ma_bar = _LONG_BARS[ma['long_count']] + _SHORT_BARS[ma['short_count']]
+        parts.append("📊 Medias Móviles\n")
+        parts.append(f"  Venta    Neutral   Compra\n")
+        parts.append(f"    {ma['short_count']}         {ma['neutral_count']}        {ma['long_count']}\n")
+        parts.append(f"  \n")
+        parts.append(f"  {ma_bar} ")
         
         # MA signal label
         if ma['signal'] == 'STRONG_BUY':
-            msg += "Fuerte Compra\n\n"
+            parts.append("Fuerte Compra\n\n")
         elif ma['signal'] == 'BUY':
-            msg += "Compra\n\n"
+            parts.append("Compra\n\n")
         elif ma['signal'] == 'STRONG_SELL':
-            msg += "Fuerte Venta\n\n"
+            parts.append("Fuerte Venta\n\n")
         elif ma['signal'] == 'SELL':
-            msg += "Venta\n\n"
+            parts.append("Venta\n\n")
         else:
-            msg += "Neutral\n\n"
+            parts.append("Neutral\n\n")
         
         # SUMMARY
         summary = grouped_votes['summary']
         if summary['signal'] == 'STRONG_BUY':
-            msg += "Resumen: 🟢 FUERTE COMPRA\n"
+            parts.append("Resumen: 🟢 FUERTE COMPRA\n")
         elif summary['signal'] == 'BUY':
-            msg += "Resumen: 🟢 COMPRA\n"
+            parts.append("Resumen: 🟢 COMPRA\n")
         elif summary['signal'] == 'STRONG_SELL':
-            msg += "Resumen: 🔴 FUERTE VENTA\n"
+            parts.append("Resumen: 🔴 FUERTE VENTA\n")
         elif summary['signal'] == 'SELL':
-            msg += "Resumen: 🔴 VENTA\n"
+            parts.append("Resumen: 🔴 VENTA\n")
         else:
-            msg += "Resumen: ⚪ NEUTRAL\n"
+            parts.append("Resumen: ⚪ NEUTRAL\n")
         
         # Show if both groups confirm
         if summary['signal'] in ['STRONG_BUY', 'STRONG_SELL']:
-            msg += "(Ambos grupos confirman)\n"
+            parts.append("(Ambos grupos confirman)\n")
         
-        msg += "\n"
+        parts.append("\n")
         
         # ========== MAIN SIGNAL ==========
-        msg += "━━━━━━━━━━━━━━━━━━━━\n"
+        parts.append("━━━━━━━━━━━━━━━━━━━━\n")
         if mtf_result.should_trade:
             if mtf_result.trade_direction == "LONG":
-                msg += "┏━ SEÑAL: COMPRA / LONG ▲\n\n"
+                parts.append("┏━ SEÑAL: COMPRA / LONG ▲\n\n")
             else:
-                msg += "┏━ SEÑAL: VENTA / SHORT ▼\n\n"
+                parts.append("┏━ SEÑAL: VENTA / SHORT ▼\n\n")
             
-            msg += f"{mtf_result.reason}\n\n"
-            msg += f"Confianza: {mtf_result.confidence}%\n\n"
+            parts.append(f"{mtf_result.reason}\n\n")
+            parts.append(f"Confianza: {mtf_result.confidence}%\n\n")
             
             # Entry/exit levels - FORMATO COPIABLE (HTML)
-            msg += "━━━ COPIAR ━━━\n\n"
-            msg += f"Moneda: <code>{display}</code>\n"
-            msg += f"Take Profit: <code>{format_price(tp1)}</code>\n"
-            msg += f"Stop Loss: <code>{format_price(sl)}</code>\n\n"
+            parts.append("━━━ COPIAR ━━━\n\n")
+            parts.append(f"Moneda: <code>{display}</code>\n")
+            parts.append(f"Take Profit: <code>{format_price(tp1)}</code>\n")
+            parts.append(f"Stop Loss: <code>{format_price(sl)}</code>\n\n")
         else:
-            msg += "┏━ SEÑAL: ESPERAR ⏳\n\n"
-            msg += f"{mtf_result.reason}\n\n"
+            parts.append("┏━ SEÑAL: ESPERAR ⏳\n\n")
+            parts.append(f"{mtf_result.reason}\n\n")
         
         # Warnings
         if mtf_result.warnings:
-            msg += "⚠️ Advertencias:\n"
+            parts.append("⚠️ Advertencias:\n")
             for w in mtf_result.warnings:
-                msg += f"  {w}\n"
-            msg += "\n"
+                parts.append(f"  {w}\n")
+            parts.append("\n")
         
-        msg += f"⏰ {datetime.now(MEXICO_TZ).strftime('%H:%M:%S')}\n"
-        msg += "┗━━━━━━━━━━━━━━━━━━━━"
+        parts.append(f"⏰ {datetime.now(MEXICO_TZ).strftime('%H:%M:%S')}\n")
+        parts.append("┗━━━━━━━━━━━━━━━━━━━━")
+        msg = ''.join(parts)
         
         keyboard = [[InlineKeyboardButton("← Inicio", callback_data="menu_inicio")]]
         await loading_msg.edit_text(msg, parse_mode=ParseMode.HTML, reply_markup=InlineKeyboardMarkup(keyboard))
@@ -649,6 +669,12 @@ def main():
     
     app.post_init = start_monitor_task
     
+    # Close the shared async exchange session once, when the application stops
+    async def close_exchange(application):
+        await close_async_exchange()
+    
+    app.post_shutdown = close_exchange
+    
     try:
         app.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True)
     except KeyboardInterrupt:
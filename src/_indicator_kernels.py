@@ -0,0 +1,300 @@
+"""
+Numba kernels for the hot indicators (SMA, EMA, RSI, MACD, ATR, ADX, Stochastic)
+They reproduce the pandas rolling/ewm arithmetic used by the `ta` library
+step by step, so results match `ta` bit for bit on the same input
+nogil: analyze_many runs analyses on threads; the kernels don't hold the GIL
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def _sma(values, window):
+    """
+    Rolling mean over `window` values (pandas rolling(window).mean())
+
+    Uses the same compensated add/remove running sum as pandas; NaN until
+    `window` valid observations are in the window.
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    compensation_add = 0.0
+    compensation_remove = 0.0
+    num_consecutive_same_value = 0
+    prev_value = values[0] if n > 0 else 0.0
+
+    for i in range(n):
+        # Remove the value leaving the window
+        if i >= window:
+            val = values[i - window]
+            if val == val:
+                nobs -= 1
+                y = -val - compensation_remove
+                t = sum_x + y
+                compensation_remove = t - sum_x - y
+                sum_x = t
+                if val < 0:
+                    neg_ct -= 1
+
+        # Add the new value
+        val = values[i]
+        if val == val:
+            nobs += 1
+            y = val - compensation_add
+            t = sum_x + y
+            compensation_add = t - sum_x - y
+            sum_x = t
+            if val < 0:
+                neg_ct += 1
+            if val == prev_value:
+                num_consecutive_same_value += 1
+            else:
+                num_consecutive_same_value = 1
+            prev_value = val
+
+        if nobs >= window and nobs > 0:
+            result = sum_x / nobs
+            if num_consecutive_same_value >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _ewm_mean(values, com, min_periods):
+    """
+    Exponentially weighted mean (pandas ewm(com=com, adjust=False).mean())
+
+    Args:
+        values: float64 array
+        com: Center of mass (span s -> (s - 1) / 2, alpha a -> (1 - a) / a)
+        min_periods: Valid observations required before emitting a value
+    """
+    n = values.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    new_wt = alpha
+
+    weighted = values[0]
+    nobs = 1 if weighted == weighted else 0
+    out[0] = weighted if nobs >= min_periods else np.nan
+    old_wt = 1.0
+
+    for i in range(1, n):
+        cur = values[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if com == 1.0:
+                new_wt = 1.0 - old_wt
+            if is_observation:
+                if weighted != cur:
+                    weighted = old_wt * weighted + new_wt * cur
+                    weighted /= (old_wt + new_wt)
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _ema(values, window):
+    """EMA with span `window`, NaN for the first window - 1 values (ta EMAIndicator)"""
+    return _ewm_mean(values, (window - 1.0) / 2.0, window)
+
+
+@njit(cache=True, nogil=True)
+def _macd(close, fast, slow, signal):
+    """
+    MACD line, signal line and histogram (ta MACD)
+
+    Returns:
+        (macd, macd_signal, macd_hist)
+    """
+    macd = _ema(close, fast) - _ema(close, slow)
+    macd_signal = _ema(macd, signal)
+    return macd, macd_signal, macd - macd_signal
+
+
+@njit(cache=True, nogil=True)
+def _rsi(close, window):
+    """Wilder RSI (ta RSIIndicator): 100 when there are no down moves"""
+    n = close.shape[0]
+    up = np.zeros(n)
+    down = np.zeros(n)
+    for i in range(1, n):
+        diff = close[i] - close[i - 1]
+        if diff > 0:
+            up[i] = diff
+        elif diff < 0:
+            down[i] = -diff
+
+    alpha = 1.0 / window
+    com = (1.0 - alpha) / alpha
+    ema_up = _ewm_mean(up, com, window)
+    ema_down = _ewm_mean(down, com, window)
+
+    out = np.empty(n)
+    for i in range(n):
+        if ema_down[i] == 0:
+            out[i] = 100.0
+        else:
+            out[i] = 100.0 - 100.0 / (1.0 + ema_up[i] / ema_down[i])
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _atr(true_range, window, seed):
+    """
+    Wilder ATR over a true range series (ta AverageTrueRange)
+
+    Args:
+        true_range: float64 array
+        window: Smoothing period
+        seed: Mean of the first `window` true ranges (numpy mean, as pandas)
+
+    Returns:
+        ATR array, 0 before the first full window (as `ta`)
+    """
+    n = true_range.shape[0]
+    out = np.zeros(n)
+    if n < window:
+        return out
+    out[window - 1] = seed
+    for i in range(window, n):
+        out[i] = (out[i - 1] * (window - 1) + true_range[i]) / float(window)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _np_sum(values):
+    """
+    Sum in numpy's pairwise order (8-way unrolled, as pandas/numpy .sum())
+
+    A plain loop differs from .sum()/.mean() in the last bits. Valid for up
+    to 128 values (one numpy block).
+    """
+    n = values.shape[0]
+    if n < 8:
+        res = 0.0
+        for i in range(n):
+            res += values[i]
+        return res
+    r = values[:8].copy()
+    i = 8
+    while i < n - (n % 8):
+        for j in range(8):
+            r[j] += values[i + j]
+        i += 8
+    res = ((r[0] + r[1]) + (r[2] + r[3])) + ((r[4] + r[5]) + (r[6] + r[7]))
+    while i < n:
+        res += values[i]
+        i += 1
+    return res
+
+
+@njit(cache=True, nogil=True)
+def _adx(high, low, close, window):
+    """
+    ADX, +DI and -DI (ta ADXIndicator, including its zero-filled edges)
+
+    Returns:
+        (adx, adx_pos, adx_neg)
+    """
+    n = close.shape[0]
+    size = n - (window - 1)
+    if size <= window:
+        raise ValueError("not enough candles for ADX")
+
+    # Directional movement range and +DM/-DM (index 0 has no previous bar)
+    dm_range = np.empty(n)
+    pos = np.empty(n)
+    neg = np.empty(n)
+    dm_range[0] = pos[0] = neg[0] = np.nan
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        dm_range[i] = max(high[i], prev_close) - min(low[i], prev_close)
+        diff_up = high[i] - high[i - 1]
+        diff_down = low[i - 1] - low[i]
+        pos[i] = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg[i] = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+
+    # Wilder sums; like ta, the last slot is left at 0
+    trs = np.zeros(size)
+    dip = np.zeros(size)
+    din = np.zeros(size)
+    trs[0] = _np_sum(dm_range[1:window + 1])
+    dip[0] = _np_sum(pos[1:window + 1])
+    din[0] = _np_sum(neg[1:window + 1])
+    for i in range(1, size - 1):
+        trs[i] = trs[i - 1] - (trs[i - 1] / float(window)) + dm_range[window + i]
+        dip[i] = dip[i - 1] - (dip[i - 1] / float(window)) + pos[window + i]
+        din[i] = din[i - 1] - (din[i - 1] / float(window)) + neg[window + i]
+
+    directional_index = np.zeros(size)
+    for i in range(size):
+        if trs[i] != 0:
+            di_pos = 100 * (dip[i] / trs[i])
+            di_neg = 100 * (din[i] / trs[i])
+        else:
+            di_pos = 0.0
+            di_neg = 0.0
+        if di_pos + di_neg != 0:
+            directional_index[i] = 100 * np.abs((di_pos - di_neg) / (di_pos + di_neg))
+
+    adx = np.zeros(n)
+    adx_prev = _np_sum(directional_index[0:window]) / window
+    adx[window - 1 + window] = adx_prev
+    for i in range(window + 1, size):
+        adx_prev = ((adx_prev * (window - 1)) + directional_index[i - 1]) / float(window)
+        adx[window - 1 + i] = adx_prev
+
+    adx_pos = np.zeros(n)
+    adx_neg = np.zeros(n)
+    for i in range(1, size - 1):
+        if trs[i] != 0:
+            adx_pos[i + window] = 100 * (dip[i] / trs[i])
+            adx_neg[i + window] = 100 * (din[i] / trs[i])
+    return adx, adx_pos, adx_neg
+
+
+@njit(cache=True, nogil=True)
+def _stoch(high, low, close, window, smooth_window):
+    """
+    Stochastic %K and %D (ta StochasticOscillator)
+
+    Returns:
+        (stoch_k, stoch_d), NaN until the windows are full
+    """
+    n = close.shape[0]
+    stoch_k = np.full(n, np.nan)
+    for i in range(window - 1, n):
+        lowest = low[i - window + 1]
+        highest = high[i - window + 1]
+        for j in range(i - window + 2, i + 1):
+            lowest = min(lowest, low[j])
+            highest = max(highest, high[j])
+        numerator = 100 * (close[i] - lowest)
+        price_range = highest - lowest
+        if price_range != 0:
+            stoch_k[i] = numerator / price_range
+        elif numerator != 0:
+            # x/0 as numpy: signed infinity (0/0 stays NaN)
+            stoch_k[i] = np.inf if numerator > 0 else -np.inf
+    return stoch_k, _sma(stoch_k, smooth_window)
@@ -7,15 +7,39 @@ Sends automatic Telegram alerts when:
 """
 import asyncio
 import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from telegram import Bot
 from src.binance_client import get_client
-from src.technical_analysis import TechnicalAnalyzer
+from src.technical_analysis import TechnicalAnalyzer, _TIMEFRAME_ERRORS
+from src.mtf_analysis import _candle_open, _trend_entry_fresh
 
 # Mexico/Chiapas timezone (UTC-6)
 MEXICO_TZ = timezone(timedelta(hours=-6))
 
+# Candle-color alert rules:
+# (15m candle trend, 4H aligned, 1H aligned) -> (signal, strength, reason template)
+_ALERT_TABLE = {
+    ('BULLISH', True, True): ('LONG', 'confirmed', '✅ COMPRA / LONG confirmado\n   4H: ▲ | 1H: ▲ | 15m: {consecutive} velas verdes'),
+    ('BULLISH', True, False): ('LONG', 'partial', '🟢 COMPRA / LONG (4H alcista)\n   15m: {consecutive} velas verdes'),
+    ('BULLISH', False, True): ('LONG', 'partial', '🟢 COMPRA / LONG (1H alcista)\n   15m: {consecutive} velas verdes'),
+    ('BEARISH', True, True): ('SHORT', 'confirmed', '✅ VENTA / SHORT confirmado\n   4H: ▼ | 1H: ▼ | 15m: {consecutive} velas rojas'),
+    ('BEARISH', True, False): ('SHORT', 'partial', '🔴 VENTA / SHORT (4H bajista)\n   15m: {consecutive} velas rojas'),
+    ('BEARISH', False, True): ('SHORT', 'partial', '🔴 VENTA / SHORT (1H bajista)\n   15m: {consecutive} velas rojas'),
+}
+
+# Worker threads for blocking OHLCV fetches. They all share one sync ccxt
+# exchange, so keep this low to stay clear of Binance 418/429 bans
+_FETCH_MAX_WORKERS = 6
+
+# 1H/4H trend results are reused within the open candle for a few minutes
+# (freshness rules shared with MultiTimeframeAnalyzer); a hit also skips the OHLCV fetch
+_TREND_TIMEFRAMES = ('1h', '4h')
+_TREND_CACHE_MAXSIZE = 4096  # ~2 entries per futures symbol
+
 
 
 logger = logging.getLogger(__name__)
@@ -41,8 +65,13 @@ class AutoMonitor:
             self.subscribers.add(chat_id)
             
         self.client = get_client()
+        self._fetch_executor = ThreadPoolExecutor(
+            max_workers=_FETCH_MAX_WORKERS, thread_name_prefix="ohlcv"
+        )
         self.is_running = False
         self.monitored_symbols = []
+        # (symbol, timeframe) -> (candle open, time.monotonic(), (trend, candle dict))
+        self._trend_cache: OrderedDict = OrderedDict()
         
         # Persistence file
         self.subscribers_file = "subscribers.json"
@@ -101,6 +130,59 @@ class AutoMonitor:
             logger.error(f"Error loading futures symbols: {e}")
             return []
     
+    @staticmethod
+    def _analyze_trend_timeframe(symbol: str, timeframe: str, df) -> Tuple[str, Dict]:
+        """
+        Trend and candle colors of a higher timeframe (1H/4H)
+        
+        Args:
+            symbol: Trading pair (for logging)
+            timeframe: '1h' or '4h'
+            df: OHLCV DataFrame, or the exception raised while fetching it
+            
+        Returns:
+            (trend 'BULLISH'/'BEARISH'/'NONE', candle color dict)
+        """
+        trend = 'NONE'
+        candle = {'trend_change': 'NONE', 'candle_colors': '', 'consecutive_green': 0, 'consecutive_red': 0}
+        try:
+            if isinstance(df, BaseException):
+                raise df
+            if df is not None and len(df) >= 10:
+                analyzer = TechnicalAnalyzer(df)
+                analyzer.calculate_all_indicators()
+                ma = analyzer.detect_ma_crossover()
+                candle = analyzer.detect_candle_color_trend(lookback=6)
+                
+                if 'LONG' in ma['signal'] or ma['ma7'] > ma['ma25']:
+                    trend = 'BULLISH'
+                elif 'SHORT' in ma['signal'] or ma['ma7'] < ma['ma25']:
+                    trend = 'BEARISH'
+        except _TIMEFRAME_ERRORS as e:
+            logger.warning("%s analysis unavailable for %s: %s", timeframe, symbol, e)
+        return trend, candle
+    
+    def _get_cached_trend(self, symbol: str, timeframe: str) -> Optional[Tuple[str, Dict]]:
+        """Cached (trend, candle) for the current open candle if still fresh, or None"""
+        key = (symbol, timeframe)
+        entry = self._trend_cache.get(key)
+        if entry is None:
+            return None
+        candle_open, stored_at, result = entry
+        if not _trend_entry_fresh(timeframe, candle_open, stored_at, time.time()):
+            del self._trend_cache[key]
+            return None
+        self._trend_cache.move_to_end(key)
+        return result
+    
+    def _store_trend(self, symbol: str, timeframe: str, result: Tuple[str, Dict]):
+        """Remember a trend result for the current open candle (LRU bounded)"""
+        key = (symbol, timeframe)
+        self._trend_cache[key] = (_candle_open(timeframe, time.time()), time.monotonic(), result)
+        self._trend_cache.move_to_end(key)
+        if len(self._trend_cache) > _TREND_CACHE_MAXSIZE:
+            self._trend_cache.popitem(last=False)
+    
     async def analyze_symbol(self, symbol: str) -> Optional[Dict]:
         """
         Analyze a single symbol using CANDLE COLOR STRATEGY
@@ -120,8 +202,20 @@ class AutoMonitor:
             # Get symbol name for display
             symbol_name = symbol.replace('/USDT:USDT', 'USDT').replace('/USDT', 'USDT')
             
+            # Fetch 15m and the uncached 1H/4H concurrently (blocking I/O off the event loop)
+            trends = {tf: self._get_cached_trend(symbol, tf) for tf in _TREND_TIMEFRAMES}
+            missing = [tf for tf, cached in trends.items() if cached is None]
+            loop = asyncio.get_running_loop()
+            df_15m, *trend_dfs = await asyncio.gather(
+                loop.run_in_executor(self._fetch_executor, self.client.get_ohlcv, symbol, '15m', 100),
+                *[loop.run_in_executor(self._fetch_executor, self.client.get_ohlcv, symbol, tf, 50)
+                  for tf in missing],
+                return_exceptions=True,
+            )
+            if isinstance(df_15m, BaseException):
+                raise df_15m
+            
             # ========== 15M ANALYSIS (CONFIRMATION) ==========
-            df_15m = self.client.get_ohlcv(symbol, '15m', limit=100)
             if df_15m is None or len(df_15m) < 30:
                 return None
             
@@ -133,91 +227,31 @@ class AutoMonitor:
             
             current_price = df_15m['close'].iloc[-1]
             
-            # ========== 1H ANALYSIS (INTERMEDIATE) ==========
-            trend_1h = 'NONE'
-            candle_1h = {'trend_change': 'NONE', 'candle_colors': '', 'consecutive_green': 0, 'consecutive_red': 0}
-            try:
-                df_1h = self.client.get_ohlcv(symbol, '1h', limit=50)
-                if df_1h is not None and len(df_1h) >= 10:
-                    analyzer_1h = TechnicalAnalyzer(df_1h)
-                    analyzer_1h.calculate_all_indicators()
-                    ma_1h = analyzer_1h.detect_ma_crossover()
-                    candle_1h = analyzer_1h.detect_candle_color_trend(lookback=6)
-                    
-                    if 'LONG' in ma_1h['signal'] or ma_1h['ma7'] > ma_1h['ma25']:
-                        trend_1h = 'BULLISH'
-                    elif 'SHORT' in ma_1h['signal'] or ma_1h['ma7'] < ma_1h['ma25']:
-                        trend_1h = 'BEARISH'
-            except:
-                pass
-            
-            # ========== 4H ANALYSIS (MAIN TREND) ==========
-            trend_4h = 'NONE'
-            candle_4h = {'trend_change': 'NONE', 'candle_colors': '', 'consecutive_green': 0, 'consecutive_red': 0}
-            try:
-                df_4h = self.client.get_ohlcv(symbol, '4h', limit=50)
-                if df_4h is not None and len(df_4h) >= 10:
-                    analyzer_4h = TechnicalAnalyzer(df_4h)
-                    analyzer_4h.calculate_all_indicators()
-                    ma_4h = analyzer_4h.detect_ma_crossover()
-                    candle_4h = analyzer_4h.detect_candle_color_trend(lookback=6)
-                    
-                    if 'LONG' in ma_4h['signal'] or ma_4h['ma7'] > ma_4h['ma25']:
-                        trend_4h = 'BULLISH'
-                    elif 'SHORT' in ma_4h['signal'] or ma_4h['ma7'] < ma_4h['ma25']:
-                        trend_4h = 'BEARISH'
-            except:
-                pass
+            # ========== 1H / 4H ANALYSIS (INTERMEDIATE / MAIN TREND) ==========
+            for tf, df in zip(missing, trend_dfs):
+                trends[tf] = self._analyze_trend_timeframe(symbol, tf, df)
+                if not isinstance(df, BaseException) and df is not None and len(df) >= 10:
+                    self._store_trend(symbol, tf, trends[tf])
+            trend_1h, candle_1h = trends['1h']
+            trend_4h, candle_4h = trends['4h']
             
             # ========== DECISION LOGIC (CANDLE COLOR STRATEGY) ==========
             candle_trend = candle_15m.get('trend_change', 'NONE')
             candle_confirmed = candle_15m.get('confirmed', False)
             consecutive = max(candle_15m.get('consecutive_green', 0), candle_15m.get('consecutive_red', 0))
             
-            should_alert = False
-            signal_type = None
-            signal_strength = 'normal'
-            reason = ''
-            
-            # LONG / COMPRA: 3+ green candles + timeframes aligned
-            if candle_trend == 'BULLISH' and candle_confirmed:
-                if trend_4h == 'BULLISH' and trend_1h == 'BULLISH':
-                    should_alert = True
-                    signal_type = 'LONG'
-                    signal_strength = 'confirmed'
-                    reason = f'✅ COMPRA / LONG confirmado\n   4H: ▲ | 1H: ▲ | 15m: {consecutive} velas verdes'
-                elif trend_4h == 'BULLISH':
-                    should_alert = True
-                    signal_type = 'LONG'
-                    signal_strength = 'partial'
-                    reason = f'🟢 COMPRA / LONG (4H alcista)\n   15m: {consecutive} velas verdes'
-                elif trend_1h == 'BULLISH':
-                    should_alert = True
-                    signal_type = 'LONG'
-                    signal_strength = 'partial'
-                    reason = f'🟢 COMPRA / LONG (1H alcista)\n   15m: {consecutive} velas verdes'
-            
-            # SHORT / VENTA: 3+ red candles + timeframes aligned
-            elif candle_trend == 'BEARISH' and candle_confirmed:
-                if trend_4h == 'BEARISH' and trend_1h == 'BEARISH':
-                    should_alert = True
-                    signal_type = 'SHORT'
-                    signal_strength = 'confirmed'
-                    reason = f'✅ VENTA / SHORT confirmado\n   4H: ▼ | 1H: ▼ | 15m: {consecutive} velas rojas'
-                elif trend_4h == 'BEARISH':
-                    should_alert = True
-                    signal_type = 'SHORT'
-                    signal_strength = 'partial'
-                    reason = f'🔴 VENTA / SHORT (4H bajista)\n   15m: {consecutive} velas rojas'
-                elif trend_1h == 'BEARISH':
-                    should_alert = True
-                    signal_type = 'SHORT'
-                    signal_strength = 'partial'
-                    reason = f'🔴 VENTA / SHORT (1H bajista)\n   15m: {consecutive} velas rojas'
-            
-            if not should_alert:
+            # Alert only on 3+ confirmed candles with 4H and/or 1H on the same side
+            alert = None
+            if candle_confirmed:
+                alert = _ALERT_TABLE.get(
+                    (candle_trend, trend_4h == candle_trend, trend_1h == candle_trend)
+                )
+            if alert is None:
                 return None
             
+            signal_type, signal_strength, reason_tmpl = alert
+            reason = reason_tmpl.format(consecutive=consecutive)
+            
             # Check if we already sent this signal recently
             last_signal = self.last_signals.get(symbol_name)
             if last_signal:
@@ -333,74 +367,76 @@ class AutoMonitor:
             else:
                 header = f"📊 <b>SEÑAL - {symbol_name}</b>"
             
-            msg = f"{header}\n\n"
+            parts = [f"{header}\n\n"]
             
             # Cripto copiable
-            msg += f"Cripto: <code>{symbol_name}</code>\n\n"
+            parts.append(f"Cripto: <code>{symbol_name}</code>\n\n")
             
-            msg += f"💰 Precio: {fmt_price(result['price'])}\n\n"
+            parts.append(f"💰 Precio: {fmt_price(result['price'])}\n\n")
             
             # ========== MULTI-TIMEFRAME ANALYSIS ==========
-            msg += "━━━ Análisis Multi-Timeframe ━━━\n"
+            parts.append("━━━ Análisis Multi-Timeframe ━━━\n")
             
             # 4H
             trend_4h = result.get('trend_4h', 'NONE')
             candle_4h = result.get('candle_4h', {})
             if trend_4h == 'BULLISH':
-                msg += f"📊 4H: ▲ ALCISTA\n"
+                parts.append(f"📊 4H: ▲ ALCISTA\n")
             elif trend_4h == 'BEARISH':
-                msg += f"📊 4H: ▼ BAJISTA\n"
+                parts.append(f"📊 4H: ▼ BAJISTA\n")
             else:
-                msg += f"📊 4H: ▬ LATERAL\n"
+                parts.append(f"📊 4H: ▬ LATERAL\n")
             if candle_4h.get('candle_colors'):
-                msg += f"   Velas: {candle_4h['candle_colors']}\n"
+                parts.append(f"   Velas: {candle_4h['candle_colors']}\n")
             
             # 1H
             trend_1h = result.get('trend_1h', 'NONE')
             candle_1h = result.get('candle_1h', {})
             if trend_1h == 'BULLISH':
-                msg += f"📊 1H: ▲ ALCISTA\n"
+                parts.append(f"📊 1H: ▲ ALCISTA\n")
             elif trend_1h == 'BEARISH':
-                msg += f"📊 1H: ▼ BAJISTA\n"
+                parts.append(f"📊 1H: ▼ BAJISTA\n")
             else:
-                msg += f"📊 1H: ▬ LATERAL\n"
+                parts.append(f"📊 1H: ▬ LATERAL\n")
             if candle_1h.get('candle_colors'):
-                msg += f"   Velas: {candle_1h['candle_colors']}\n"
+                parts.append(f"   Velas: {candle_1h['candle_colors']}\n")
             
             # 15m (KEY)
             candle_15m = result.get('candle_15m', {})
             consecutive = max(candle_15m.get('consecutive_green', 0), candle_15m.get('consecutive_red', 0))
             if candle_15m.get('trend_change') == 'BULLISH':
-                msg += f"📊 15m: ▲ {consecutive} velas VERDES\n"
+                parts.append(f"📊 15m: ▲ {consecutive} velas VERDES\n")
             elif candle_15m.get('trend_change') == 'BEARISH':
-                msg += f"📊 15m: ▼ {consecutive} velas ROJAS\n"
+                parts.append(f"📊 15m: ▼ {consecutive} velas ROJAS\n")
             else:
-                msg += f"📊 15m: ▬ Sin tendencia\n"
+                parts.append(f"📊 15m: ▬ Sin tendencia\n")
             if candle_15m.get('candle_colors'):
-                msg += f"   Velas: {candle_15m['candle_colors']}\n"
+                parts.append(f"   Velas: {candle_15m['candle_colors']}\n")
             
             if candle_15m.get('confirmed'):
-                msg += "   ✅ <b>Confirmado (3+ velas)</b>\n"
+                parts.append("   ✅ <b>Confirmado (3+ velas)</b>\n")
             
-            msg += "\n"
+            parts.append("\n")
             
             # ========== SIGNAL ==========
-            msg += "━━━━━━━━━━━━━━━━━━━━\n"
+            parts.append("━━━━━━━━━━━━━━━━━━━━\n")
             if signal == 'LONG':
-                msg += f"┏━ <b>SEÑAL: COMPRA / LONG ▲</b>\n\n"
+                parts.append(f"┏━ <b>SEÑAL: COMPRA / LONG ▲</b>\n\n")
             else:
-                msg += f"┏━ <b>SEÑAL: VENTA / SHORT ▼</b>\n\n"
+                parts.append(f"┏━ <b>SEÑAL: VENTA / SHORT ▼</b>\n\n")
             
-            msg += f"{result['reason']}\n\n"
+            parts.append(f"{result['reason']}\n\n")
             
             # Levels - FORMATO COPIABLE (HTML)
-            msg += f"━━━ COPIAR ━━━\n\n"
-            msg += f"Moneda: <code>{symbol_name}</code>\n"
-            msg += f"Take Profit: <code>{fmt_price(result['tp'])}</code>\n"
-            msg += f"Stop Loss: <code>{fmt_price(result['sl'])}</code>\n\n"
+            parts.append(f"━━━ COPIAR ━━━\n\n")
+            parts.append(f"Moneda: <code>{symbol_name}</code>\n")
+            parts.append(f"Take Profit: <code>{fmt_price(result['tp'])}</code>\n")
+            parts.append(f"Stop Loss: <code>{fmt_price(result['sl'])}</code>\n\n")
+            
+            parts.append(f"⏰ {datetime.now(MEXICO_TZ).strftime('%H:%M:%S')}\n")
+            parts.append("┗━━━━━━━━━━━━━━━━━━━━")
             
-            msg += f"⏰ {datetime.now(MEXICO_TZ).strftime('%H:%M:%S')}\n"
-            msg += "┗━━━━━━━━━━━━━━━━━━━━"
+            msg = ''.join(parts)
             
             # Send to ALL subscribers
             for chat_id in self.subscribers:
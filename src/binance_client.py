@@ -3,17 +3,36 @@ Binance Client Module
 Handles all interactions with Binance Futures API using ccxt
 """
 import ccxt
-from typing import Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
 import pandas as pd
-from datetime import datetime
 from src.config import config
 
+logger = logging.getLogger(__name__)
+
+# Transient network errors on OHLCV fetches are retried with exponential backoff
+_OHLCV_RETRIES = 1
+_RETRY_BASE_DELAY = 0.2  # seconds
+
+# Seconds a downloaded OHLCV frame is reused, per timeframe (1/60 of the candle:
+# the open candle keeps moving, so the cache only absorbs back-to-back requests)
+_OHLCV_CACHE_TTL = {'1m': 1, '5m': 5, '15m': 15, '1h': 60, '4h': 240, '1d': 1440}
+_OHLCV_CACHE_TTL_DEFAULT = 15
+_OHLCV_CACHE_MAXSIZE = 256
+
 
 class BinanceClient:
     """Client for interacting with Binance Futures API"""
     
     def __init__(self):
         """Initialize Binance client with API credentials"""
+        # (symbol, timeframe, limit) -> (time.monotonic() at download, DataFrame)
+        self._ohlcv_cache: OrderedDict = OrderedDict()
+        self._ohlcv_lock = threading.Lock()  # AutoMonitor fetches from worker threads
+        
         try:
             # Initialize exchange
             if config.EXCHANGE == 'binanceusdm':
@@ -56,13 +75,22 @@ class BinanceClient:
             
         Returns:
             DataFrame with columns: timestamp, open, high, low, close, volume
+            (shared with the cache for a few seconds: do not modify it)
         """
         try:
             timeframe = timeframe or config.DEFAULT_TIMEFRAME
             limit = limit or config.CANDLES_LIMIT
             
+            key = (symbol, timeframe, limit)
+            ttl = _OHLCV_CACHE_TTL.get(timeframe, _OHLCV_CACHE_TTL_DEFAULT)
+            with self._ohlcv_lock:
+                cached = self._ohlcv_cache.get(key)
+                if cached is not None and time.monotonic() - cached[0] < ttl:
+                    self._ohlcv_cache.move_to_end(key)
+                    return cached[1]
+            
             # Fetch OHLCV data
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ohlcv = self._fetch_ohlcv_with_retry(symbol, timeframe, limit)
             
             # Convert to DataFrame
             df = pd.DataFrame(
@@ -73,11 +101,30 @@ class BinanceClient:
             # Convert timestamp to datetime but keep as column (not index)
             df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             
+            with self._ohlcv_lock:
+                self._ohlcv_cache[key] = (time.monotonic(), df)
+                self._ohlcv_cache.move_to_end(key)
+                if len(self._ohlcv_cache) > _OHLCV_CACHE_MAXSIZE:
+                    self._ohlcv_cache.popitem(last=False)
+            
             return df
             
         except Exception as e:
             raise ValueError(f"Error fetching OHLCV for {symbol}: {str(e)}")
     
+    def _fetch_ohlcv_with_retry(self, symbol: str, timeframe: str, limit: int) -> list:
+        """fetch_ohlcv, retrying transient ccxt.NetworkError with exponential backoff"""
+        for attempt in range(_OHLCV_RETRIES + 1):
+            try:
+                return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            except ccxt.NetworkError as e:
+                if attempt == _OHLCV_RETRIES:
+                    raise
+                delay = _RETRY_BASE_DELAY * 2 ** attempt
+                logger.warning("OHLCV %s %s fetch failed (%s), retrying in %.1fs",
+                               symbol, timeframe, e, delay)
+                time.sleep(delay)
+    
     def get_ticker(self, symbol: str) -> Dict:
         """
         Get current ticker information for a symbol
@@ -90,19 +137,46 @@ class BinanceClient:
         """
         try:
             ticker = self.exchange.fetch_ticker(symbol)
-            return {
-                'symbol': symbol,
-                'price': ticker['last'],
-                'change_24h': ticker['percentage'],
-                'high_24h': ticker['high'],
-                'low_24h': ticker['low'],
-                'volume_24h': ticker['quoteVolume'],
-                'bid': ticker['bid'],
-                'ask': ticker['ask'],
-            }
+            return self._format_ticker(symbol, ticker)
         except Exception as e:
             raise ValueError(f"Error fetching ticker for {symbol}: {str(e)}")
     
+    def get_tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """
+        Get ticker information for many symbols with one bulk request
+        
+        Args:
+            symbols: List of trading pairs
+            
+        Returns:
+            Dictionary of symbol -> ticker data (same format as get_ticker);
+            symbols missing from the exchange response are omitted
+        """
+        try:
+            tickers = self.exchange.fetch_tickers(symbols)
+        except Exception as e:
+            raise ValueError(f"Error fetching tickers: {str(e)}")
+        
+        return {
+            symbol: self._format_ticker(symbol, tickers[symbol])
+            for symbol in symbols
+            if symbol in tickers
+        }
+    
+    @staticmethod
+    def _format_ticker(symbol: str, ticker: Dict) -> Dict:
+        """Convert a ccxt ticker into the bot's ticker format"""
+        return {
+            'symbol': symbol,
+            'price': ticker['last'],
+            'change_24h': ticker['percentage'],
+            'high_24h': ticker['high'],
+            'low_24h': ticker['low'],
+            'volume_24h': ticker['quoteVolume'],
+            'bid': ticker['bid'],
+            'ask': ticker['ask'],
+        }
+    
     def get_multiple_tickers(self, symbols: List[str]) -> List[Dict]:
         """
         Get ticker information for multiple symbols
@@ -26,6 +26,9 @@ class Config:
     # Signal Settings
     MIN_SIGNAL_SCORE = int(os.getenv('MIN_SIGNAL_SCORE', '55'))  # Lower for more scalping opportunities
     
+    # On-disk cache for 1H/4H MTF data (empty to disable)
+    MTF_DISK_CACHE_DIR = os.getenv('MTF_DISK_CACHE_DIR', '.cache/mtf')
+    
     # Top coins to monitor (Binance Futures USDT Perpetual pairs)
     TOP_SYMBOLS = [
         'BTC/USDT:USDT', 'ETH/USDT:USDT', 'BNB/USDT:USDT', 'XRP/USDT:USDT', 'ADA/USDT:USDT',
@@ -207,13 +207,14 @@ class FeatureEngineer:
     
     def _calculate_volatility_features(self):
         """Calculate volatility features including Z-Score"""
-        # ATR (Average True Range)
-        high_low = self.df['high'] - self.df['low']
-        high_close = abs(self.df['high'] - self.df['close'].shift())
-        low_close = abs(self.df['low'] - self.df['close'].shift())
-        
-        true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        self.df['atr'] = true_range.rolling(14).mean()
+        # ATR (Average True Range), true range on numpy arrays
+        high = self.df['high'].to_numpy(dtype=np.float64)
+        low = self.df['low'].to_numpy(dtype=np.float64)
+        prev_close = self.df['close'].shift().to_numpy(dtype=np.float64)
+        
+        # fmax ignores the missing previous close on the first row
+        true_range = np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+        self.df['atr'] = pd.Series(true_range, index=self.df.index).rolling(14).mean()
         self.df['atr_percent'] = (self.df['atr'] / self.df['close']) * 100
         
         # Historical volatility (std of returns)
@@ -13,27 +13,207 @@ Señal SHORT:
 - 3 flechas TradingView: ABAJO
 """
 
+import asyncio
+import logging
+import time
+from datetime import datetime
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import ccxt
+import ccxt.async_support as ccxt_async
 from src.config import Config
 
+logger = logging.getLogger(__name__)
 
-class MAStrategy:
-    """Estrategia basada en cruces de MA7 y MA25"""
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Media móvil simple vía suma acumulada (equivalente a rolling(window).mean())
     
-    def __init__(self):
-        self.exchange = ccxt.binanceusdm({
+    Las primeras window-1 posiciones quedan en NaN, igual que pandas.
+    """
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] < window:
+        return out
+    
+    csum = np.cumsum(values, dtype=np.float64)
+    out[window - 1] = csum[window - 1] / window
+    out[window:] = (csum[window:] - csum[:-window]) / window
+    return out
+
+
+def _ewm_last(values: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    Último valor de varias EMAs (adjust=False) en una sola pasada
+    
+    Usa la forma cerrada de la recurrencia y = (1-a)*y + a*x:
+    y_n = (1-a)^(n-1) * x_0 + sum(a * (1-a)^(n-1-t) * x_t)
+    
+    Args:
+        values: Serie de precios (float64)
+        alphas: Factores de suavizado, uno por EMA
+        
+    Returns:
+        Array con el último valor de cada EMA
+    """
+    n = values.shape[0]
+    decay = 1.0 - alphas[:, None]
+    powers = decay ** np.arange(n - 1, -1, -1)[None, :]
+    weights = alphas[:, None] * powers
+    weights[:, 0] = powers[:, 0]
+    return weights @ values
+
+
+def _rsi_last(close: np.ndarray, window: int = 14) -> float:
+    """RSI de Wilder (mismo cálculo que ta.momentum.RSIIndicator), último valor"""
+    diff = np.diff(close, prepend=close[0])
+    alpha = np.array([1.0 / window])
+    ema_up = _ewm_last(np.where(diff > 0, diff, 0.0), alpha)[0]
+    ema_down = _ewm_last(np.where(diff < 0, -diff, 0.0), alpha)[0]
+    if ema_down == 0:
+        return 100.0
+    return 100.0 - (100.0 / (1.0 + ema_up / ema_down))
+
+
+def _stoch_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> float:
+    """Estocástico %K sobre las últimas `window` velas"""
+    lowest = low[-window:].min()
+    highest = high[-window:].max()
+    return 100.0 * (close[-1] - lowest) / (highest - lowest)
+
+
+def _cci_last(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+              window: int = 20, constant: float = 0.015) -> float:
+    """CCI sobre las últimas `window` velas (desviación media absoluta)"""
+    typical_price = (high[-window:] + low[-window:] + close[-window:]) / 3.0
+    sma = typical_price.mean()
+    mean_deviation = np.abs(typical_price - sma).mean()
+    return (typical_price[-1] - sma) / (constant * mean_deviation)
+
+
+# Periodos de las EMAs del grupo de medias móviles (TradingView)
+_TV_EMA_PERIODS = np.array([10, 20, 30, 50, 100, 200])
+_TV_EMA_ALPHAS = 2.0 / (_TV_EMA_PERIODS + 1.0)
+
+# Columnas de la respuesta fetch_ohlcv de ccxt
+_OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Velas de 15m por evaluación (mismo tamaño de descarga que el original)
+_EXPERT_15M_LIMIT = 100
+
+# Multiplicadores (SL, TP) sobre el precio de entrada: ±10%
+_SL_TP_FACTORS = {
+    'LONG': (0.90, 1.10),
+    'SHORT': (1.10, 0.90),
+}
+
+# Caché de velas: {(symbol, timeframe, limit): (instante de descarga, DataFrame)}
+_OHLCV_CACHE: Dict[Tuple[str, str, int], Tuple[float, pd.DataFrame]] = {}
+
+# Segundos que una descarga se considera vigente, por timeframe
+_OHLCV_TTL = {'15m': 15, '4h': 60}
+_OHLCV_TTL_DEFAULT = 15
+
+# Instancia única del exchange (el rate limiter de ccxt es por instancia)
+_exchange_instance = None
+
+def get_exchange() -> ccxt.binanceusdm:
+    """Get or create the shared ccxt Binance Futures instance"""
+    global _exchange_instance
+    if _exchange_instance is None:
+        _exchange_instance = ccxt.binanceusdm({
+            'apiKey': Config.BINANCE_API_KEY,
+            'secret': Config.BINANCE_SECRET_KEY,
+            'enableRateLimit': True,
+        })
+    return _exchange_instance
+
+
+# Instancia asíncrona compartida (se crea dentro del event loop que la usa)
+_async_exchange_instance = None
+
+def get_async_exchange() -> ccxt_async.binanceusdm:
+    """Get or create the shared async ccxt Binance Futures instance"""
+    global _async_exchange_instance
+    if _async_exchange_instance is None:
+        _async_exchange_instance = ccxt_async.binanceusdm({
             'apiKey': Config.BINANCE_API_KEY,
             'secret': Config.BINANCE_SECRET_KEY,
             'enableRateLimit': True,
         })
+    return _async_exchange_instance
+
+
+async def close_async_exchange():
+    """Close the shared async exchange session (call at shutdown)"""
+    global _async_exchange_instance
+    if _async_exchange_instance is not None:
+        await _async_exchange_instance.close()
+        _async_exchange_instance = None
+
+
+def _cached_ohlcv(symbol: str, timeframe: str, limit: int) -> Optional[pd.DataFrame]:
+    """Devuelve las velas en caché si siguen vigentes, o None"""
+    cached = _OHLCV_CACHE.get((symbol, timeframe, limit))
+    if cached is None:
+        return None
+    if time.monotonic() - cached[0] >= _OHLCV_TTL.get(timeframe, _OHLCV_TTL_DEFAULT):
+        return None
+    return cached[1]
+
+
+def _store_ohlcv(symbol: str, timeframe: str, limit: int, ohlcv: list) -> pd.DataFrame:
+    """Convierte la respuesta de ccxt a DataFrame y la guarda en caché"""
+    df = pd.DataFrame(ohlcv, columns=_OHLCV_COLUMNS)
+    _OHLCV_CACHE[(symbol, timeframe, limit)] = (time.monotonic(), df)
+    return df
+
+
+def _ohlc_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Convierte high/low/close a arrays float64 una sola vez por evaluación"""
+    return {
+        'high': df['high'].to_numpy(dtype=np.float64),
+        'low': df['low'].to_numpy(dtype=np.float64),
+        'close': df['close'].to_numpy(dtype=np.float64),
+    }
+
+
+class MAStrategy:
+    """Estrategia basada en cruces de MA7 y MA25"""
     
-    def calculate_ma_cross(self, df: pd.DataFrame, fast_period: int = 7, slow_period: int = 25) -> Dict:
+    def __init__(self):
+        self.exchange = get_exchange()
+    
+    def _fetch_ohlcv_df(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """
+        Descarga velas como DataFrame, reutilizando la caché si sigue vigente
+        
+        El DataFrame devuelto es compartido: no debe modificarse.
+        """
+        df = _cached_ohlcv(symbol, timeframe, limit)
+        if df is not None:
+            return df
+        
+        ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        return _store_ohlcv(symbol, timeframe, limit, ohlcv)
+    
+    async def _fetch_ohlcv_df_async(self, symbol: str, timeframe: str, limit: int) -> pd.DataFrame:
+        """Versión asíncrona de _fetch_ohlcv_df (comparte la misma caché)"""
+        df = _cached_ohlcv(symbol, timeframe, limit)
+        if df is not None:
+            return df
+        
+        ohlcv = await get_async_exchange().fetch_ohlcv(symbol, timeframe, limit=limit)
+        return _store_ohlcv(symbol, timeframe, limit, ohlcv)
+    
+    def calculate_ma_cross(self, df, fast_period: int = 7, slow_period: int = 25) -> Dict:
         """
         Detecta cruces de medias móviles
         
+        Args:
+            df: DataFrame de velas o dict de arrays con la clave 'close'
+        
         Returns:
             dict: {
                 'cross': 'bullish' / 'bearish' / None,
@@ -43,18 +223,15 @@ class MAStrategy:
                 'ma25_prev': float
             }
         """
-        if len(df) < slow_period + 2:
+        close = np.asarray(df['close'], dtype=np.float64)
+        if close.shape[0] < slow_period + 2:
             return {'cross': None, 'error': 'Insufficient data'}
         
-        # Calcular MAs
-        df['MA7'] = df['close'].rolling(window=fast_period).mean()
-        df['MA25'] = df['close'].rolling(window=slow_period).mean()
-        
-        # Valores actuales y previos
-        ma7_current = df['MA7'].iloc[-1]
-        ma25_current = df['MA25'].iloc[-1]
-        ma7_prev = df['MA7'].iloc[-2]
-        ma25_prev = df['MA25'].iloc[-2]
+        # Valores actuales y previos (solo las colas necesarias, sin tocar df)
+        ma7_current = float(close[-fast_period:].mean())
+        ma25_current = float(close[-slow_period:].mean())
+        ma7_prev = float(close[-fast_period - 1:-1].mean())
+        ma25_prev = float(close[-slow_period - 1:-1].mean())
         
         # Detectar cruce
         cross = None
@@ -81,31 +258,46 @@ class MAStrategy:
         """
         try:
             # Obtener velas de 4H
-            ohlcv = self.exchange.fetch_ohlcv(symbol, '4h', limit=50)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            
-            # Calcular MA de 20 periodos en 4H
-            df['MA20'] = df['close'].rolling(window=20).mean()
-            
-            current_price = df['close'].iloc[-1]
-            ma20 = df['MA20'].iloc[-1]
-            
-            # Determinar tendencia
-            if current_price > ma20:
-                return 'bullish'
-            elif current_price < ma20:
-                return 'bearish'
-            else:
-                return 'neutral'
+            df = self._fetch_ohlcv_df(symbol, '4h', limit=50)
+            return self._trend_from_4h(df)
+        
+        except Exception as e:
+            logger.warning("Error checking 4H trend for %s: %s", symbol, e)
+            return 'neutral'
+    
+    async def check_4h_trend_async(self, symbol: str) -> str:
+        """Versión asíncrona de check_4h_trend"""
+        try:
+            df = await self._fetch_ohlcv_df_async(symbol, '4h', limit=50)
+            return self._trend_from_4h(df)
         
         except Exception as e:
-            print(f"Error checking 4H trend: {str(e)}")
+            logger.warning("Error checking 4H trend for %s: %s", symbol, e)
+            return 'neutral'
+    
+    def _trend_from_4h(self, df: pd.DataFrame) -> str:
+        """Tendencia según el precio frente a la MA20 de las velas de 4H"""
+        # Calcular MA de 20 periodos en 4H
+        close = df['close'].to_numpy(dtype=np.float64)
+        
+        current_price = close[-1]
+        ma20 = _rolling_mean(close, 20)[-1]
+        
+        # Determinar tendencia
+        if current_price > ma20:
+            return 'bullish'
+        elif current_price < ma20:
+            return 'bearish'
+        else:
             return 'neutral'
     
-    def calculate_tradingview_indicators(self, df: pd.DataFrame) -> Dict:
+    def calculate_tradingview_indicators(self, df) -> Dict:
         """
         Calcula indicadores tipo TradingView
         
+        Args:
+            df: DataFrame de velas o dict de arrays con 'high', 'low', 'close'
+        
         Returns:
             dict: {
                 'oscillators': 'buy' / 'sell' / 'neutral',
@@ -113,51 +305,40 @@ class MAStrategy:
                 'summary': 'buy' / 'sell' / 'neutral'
             }
         """
-        if len(df) < 200:
+        close = np.asarray(df['close'], dtype=np.float64)
+        if close.shape[0] < 200:
             return {'oscillators': 'neutral', 'moving_averages': 'neutral', 'summary': 'neutral'}
         
-        current_price = df['close'].iloc[-1]
+        high = np.asarray(df['high'], dtype=np.float64)
+        low = np.asarray(df['low'], dtype=np.float64)
+        current_price = close[-1]
         
         # ============ OSCILLATORS ============
-        oscillator_signals = []
+        buy_count = 0
+        sell_count = 0
         
         # RSI
-        from ta.momentum import RSIIndicator
-        rsi = RSIIndicator(df['close'], window=14)
-        rsi_value = rsi.rsi().iloc[-1]
+        rsi_value = _rsi_last(close, window=14)
         if rsi_value < 40:
-            oscillator_signals.append('buy')
+            buy_count += 1
         elif rsi_value > 60:
-            oscillator_signals.append('sell')
-        else:
-            oscillator_signals.append('neutral')
+            sell_count += 1
         
         # Stochastic
-        from ta.momentum import StochasticOscillator
-        stoch = StochasticOscillator(df['high'], df['low'], df['close'])
-        stoch_k = stoch.stoch().iloc[-1]
+        stoch_k = _stoch_last(high, low, close, window=14)
         if stoch_k < 20:
-            oscillator_signals.append('buy')
+            buy_count += 1
         elif stoch_k > 80:
-            oscillator_signals.append('sell')
-        else:
-            oscillator_signals.append('neutral')
+            sell_count += 1
         
         # CCI
-        from ta.trend import CCIIndicator
-        cci = CCIIndicator(df['high'], df['low'], df['close'])
-        cci_value = cci.cci().iloc[-1]
+        cci_value = _cci_last(high, low, close, window=20)
         if cci_value < -100:
-            oscillator_signals.append('buy')
+            buy_count += 1
         elif cci_value > 100:
-            oscillator_signals.append('sell')
-        else:
-            oscillator_signals.append('neutral')
+            sell_count += 1
         
         # Resumen de osciladores
-        buy_count = oscillator_signals.count('buy')
-        sell_count = oscillator_signals.count('sell')
-        
         if buy_count > sell_count:
             oscillators_summary = 'buy'
         elif sell_count > buy_count:
@@ -166,21 +347,12 @@ class MAStrategy:
             oscillators_summary = 'neutral'
         
         # ============ MOVING AVERAGES ============
-        ma_signals = []
-        
-        # EMAs principales
-        for period in [10, 20, 30, 50, 100, 200]:
-            ema = df['close'].ewm(span=period, adjust=False).mean().iloc[-1]
-            if current_price > ema:
-                ma_signals.append('buy')
-            elif current_price < ema:
-                ma_signals.append('sell')
-            else:
-                ma_signals.append('neutral')
+        # EMAs principales (10, 20, 30, 50, 100, 200) en una sola pasada
+        emas = _ewm_last(close, _TV_EMA_ALPHAS)
         
         # Resumen de MAs
-        buy_ma_count = ma_signals.count('buy')
-        sell_ma_count = ma_signals.count('sell')
+        buy_ma_count = int((current_price > emas).sum())
+        sell_ma_count = int((current_price < emas).sum())
         
         if buy_ma_count > sell_ma_count:
             ma_summary = 'buy'
@@ -190,15 +362,10 @@ class MAStrategy:
             ma_summary = 'neutral'
         
         # ============ SUMMARY (3 ARROWS) ============
-        # Contamos: osciladores + MAs + tendencia de precio
-        signals = [oscillators_summary, ma_summary]
-        
-        buy_total = signals.count('buy')
-        sell_total = signals.count('sell')
-        
-        if buy_total >= 2:
+        # Osciladores y MAs deben coincidir
+        if oscillators_summary == 'buy' and ma_summary == 'buy':
             summary = 'buy'
-        elif sell_total >= 2:
+        elif oscillators_summary == 'sell' and ma_summary == 'sell':
             summary = 'sell'
         else:
             summary = 'neutral'
@@ -234,11 +401,11 @@ class MAStrategy:
         """
         try:
             # Obtener velas de 15M
-            ohlcv = self.exchange.fetch_ohlcv(symbol, '15m', limit=100)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df = self._fetch_ohlcv_df(symbol, '15m', limit=_EXPERT_15M_LIMIT)
+            arrays = _ohlc_arrays(df)
             
             # 1. Detectar cruce de MAs en 15M
-            ma_cross = self.calculate_ma_cross(df)
+            ma_cross = self.calculate_ma_cross(arrays)
             
             if not ma_cross.get('cross'):
                 return None  # No hay cruce
@@ -246,53 +413,93 @@ class MAStrategy:
             # 2. Verificar tendencia en 4H
             trend_4h = self.check_4h_trend(symbol)
             
-            # 3. Calcular indicadores TradingView
-            tv_indicators = self.calculate_tradingview_indicators(df)
-            
-            # Validar coincidencia
-            cross_type = ma_cross['cross']  # 'bullish' o 'bearish'
-            
-            # Para LONG: cruce bullish + tendencia 4H bullish + TV buy
-            # Para SHORT: cruce bearish + tendencia 4H bearish + TV sell
-            
-            signal = None
-            if cross_type == 'bullish' and trend_4h == 'bullish' and tv_indicators['summary'] == 'buy':
-                signal = 'LONG'
-            elif cross_type == 'bearish' and trend_4h == 'bearish' and tv_indicators['summary'] == 'sell':
-                signal = 'SHORT'
-            
-            if not signal:
-                return None  # No cumple todas las condiciones
+            return self._build_expert_signal(symbol, arrays, ma_cross, trend_4h)
+        
+        except Exception as e:
+            logger.warning("Error getting expert signal for %s: %s", symbol, e)
+            return None
+    
+    async def get_expert_signal_async(self, symbol: str) -> Optional[Dict]:
+        """
+        Versión asíncrona de get_expert_signal
+        
+        Usa la instancia async compartida para poder lanzar muchos símbolos
+        a la vez con asyncio.gather (ver scan_expert_signals).
+        """
+        try:
+            df = await self._fetch_ohlcv_df_async(symbol, '15m', limit=_EXPERT_15M_LIMIT)
+            arrays = _ohlc_arrays(df)
             
-            # Calcular precios de entrada, SL y TP
-            entry_price = df['close'].iloc[-1]
+            ma_cross = self.calculate_ma_cross(arrays)
             
-            if signal == 'LONG':
-                sl_price = entry_price * 0.90  # -10%
-                tp_price = entry_price * 1.10  # +10%
-            else:  # SHORT
-                sl_price = entry_price * 1.10  # +10%
-                tp_price = entry_price * 0.90  # -10%
+            if not ma_cross.get('cross'):
+                return None  # No hay cruce
             
-            # Determinar nivel de confianza
-            confidence = 'HIGH'
-            if trend_4h == 'neutral':
-                confidence = 'MEDIUM'
+            trend_4h = await self.check_4h_trend_async(symbol)
             
-            return {
-                'symbol': symbol,
-                'signal': signal,
-                'entry_price': entry_price,
-                'sl_price': sl_price,
-                'tp_price': tp_price,
-                'ma7': ma_cross['ma7'],
-                'ma25': ma_cross['ma25'],
-                '4h_trend': trend_4h,
-                'tradingview': tv_indicators,
-                'confidence': confidence,
-                'timestamp': pd.Timestamp.now().isoformat()
-            }
+            return self._build_expert_signal(symbol, arrays, ma_cross, trend_4h)
         
         except Exception as e:
-            print(f"Error getting expert signal for {symbol}: {str(e)}")
+            logger.warning("Error getting expert signal for %s: %s", symbol, e)
             return None
+    
+    async def scan_expert_signals(self, symbols: List[str]) -> List[Dict]:
+        """
+        Evalúa varios símbolos en paralelo
+        
+        Returns:
+            Lista de señales encontradas (solo los símbolos con señal)
+        """
+        results = await asyncio.gather(*[self.get_expert_signal_async(s) for s in symbols])
+        return [r for r in results if r]
+    
+    async def close(self):
+        """Cierra la sesión del exchange asíncrono compartido (solo al apagar la aplicación)"""
+        await close_async_exchange()
+    
+    def _build_expert_signal(self, symbol: str, arrays: Dict[str, np.ndarray], ma_cross: Dict,
+                             trend_4h: str) -> Optional[Dict]:
+        """Valida cruce + tendencia 4H + TradingView y arma la señal"""
+        # 3. Calcular indicadores TradingView
+        tv_indicators = self.calculate_tradingview_indicators(arrays)
+        
+        # Validar coincidencia
+        cross_type = ma_cross['cross']  # 'bullish' o 'bearish'
+        
+        # Para LONG: cruce bullish + tendencia 4H bullish + TV buy
+        # Para SHORT: cruce bearish + tendencia 4H bearish + TV sell
+        
+        signal = None
+        if cross_type == 'bullish' and trend_4h == 'bullish' and tv_indicators['summary'] == 'buy':
+            signal = 'LONG'
+        elif cross_type == 'bearish' and trend_4h == 'bearish' and tv_indicators['summary'] == 'sell':
+            signal = 'SHORT'
+        
+        if not signal:
+            return None  # No cumple todas las condiciones
+        
+        # Calcular precios de entrada, SL y TP
+        entry_price = float(arrays['close'][-1])
+        
+        sl_factor, tp_factor = _SL_TP_FACTORS[signal]
+        sl_price = entry_price * sl_factor
+        tp_price = entry_price * tp_factor
+        
+        # Determinar nivel de confianza
+        confidence = 'HIGH'
+        if trend_4h == 'neutral':
+            confidence = 'MEDIUM'
+        
+        return {
+            'symbol': symbol,
+            'signal': signal,
+            'entry_price': entry_price,
+            'sl_price': sl_price,
+            'tp_price': tp_price,
+            'ma7': ma_cross['ma7'],
+            'ma25': ma_cross['ma25'],
+            '4h_trend': trend_4h,
+            'tradingview': tv_indicators,
+            'confidence': confidence,
+            'timestamp': datetime.now().isoformat()
+        }
@@ -57,8 +57,13 @@ class MLConfig:
         'bagging_freq': 5,
         'verbose': -1,
         'force_col_wise': True,
-        'n_jobs': -1
+        'num_threads': int(os.getenv('ML_LGBM_THREADS', os.cpu_count() or 4)),
+        'feature_pre_filter': True,
+        'deterministic': False
     }
+    NUM_BOOST_ROUND = int(os.getenv('ML_NUM_BOOST_ROUND', '500'))  # Upper bound, early stopping decides
+    EARLY_STOPPING_ROUNDS = int(os.getenv('ML_EARLY_STOPPING_ROUNDS', '50'))
+    LOG_EVALUATION_PERIOD = int(os.getenv('ML_LOG_EVALUATION_PERIOD', '0'))  # 0 = silent
     
     # Model Storage
     MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
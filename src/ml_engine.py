@@ -5,17 +5,58 @@ LightGBM-based classification model for high-probability trade prediction
 import pandas as pd
 import numpy as np
 import lightgbm as lgb
+from numba import njit, prange
 from sklearn.model_selection import TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, roc_auc_score, classification_report
 import joblib
-import json
+import orjson
+import logging
 import os
 from datetime import datetime
 from typing import Dict, Tuple, Optional, List
 from src.ml_config import MLConfig
 from src.feature_engineering import FeatureEngineer
 
+logger = logging.getLogger(__name__)
+
+# Metrics may come back as NumPy scalars from sklearn
+_METADATA_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+
+
+@njit(parallel=True, cache=True)
+def _label_kernel(high, low, close, tp_pct, sl_pct, lookahead, out):
+    """
+    Label each candle: 1 if LONG or SHORT hits TP before SL within the next
+    `lookahead` candles, 0 otherwise. TP and SL on the same candle counts
+    as a failure. Rows without full lookahead are left untouched.
+    """
+    n = close.shape[0]
+    for i in prange(n - lookahead):
+        entry = close[i]
+        tp_long = entry * (1 + tp_pct[i] / 100)
+        sl_long = entry * (1 - sl_pct[i] / 100)
+        tp_short = entry * (1 - tp_pct[i] / 100)
+        sl_short = entry * (1 + sl_pct[i] / 100)
+        
+        long_success = False
+        for k in range(i + 1, i + 1 + lookahead):
+            if low[k] <= sl_long:
+                break
+            if high[k] >= tp_long:
+                long_success = True
+                break
+        
+        short_success = False
+        if not long_success:
+            for k in range(i + 1, i + 1 + lookahead):
+                if high[k] >= sl_short:
+                    break
+                if low[k] <= tp_short:
+                    short_success = True
+                    break
+        
+        out[i] = 1 if (long_success or short_success) else 0
+
 
 class MLEngine:
     """
@@ -31,10 +72,14 @@ class MLEngine:
             load_latest: If True, load latest trained model
         """
         self.model = None
-        self.scaler = None
         self.feature_names = None
+        self.feature_index = {}
         self.metadata = {}
         
+        # Only set for legacy models trained on StandardScaler-ed features
+        self._scaler_mean = None
+        self._scaler_scale = None
+        
         MLConfig.ensure_model_dirs()
         
         if load_latest:
@@ -64,78 +109,45 @@ class MLEngine:
             lookahead = MLConfig.LOOKAHEAD_CANDLES
         
         df = df.copy()
-        labels = []
         
-        # Calculate ATR for dynamic TP/SL if not provided
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        
+        # Per-candle TP/SL: fixed, or ATR-based if not provided
         if tp_percent is None or sl_percent is None:
-            high_low = df['high'] - df['low']
-            high_close = abs(df['high'] - df['close'].shift())
-            low_close = abs(df['low'] - df['close'].shift())
-            true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-            atr = true_range.rolling(14).mean()
-            atr_percent = (atr / df['close']) * 100
-        
-        for i in range(len(df)):
-            # Can't label last N candles (no lookahead available)
-            if i >= len(df) - lookahead:
-                labels.append(-1)  # Invalid label
-                continue
-            
-            entry_price = df['close'].iloc[i]
-            
-            # Determine TP/SL based on ATR if not fixed
-            if tp_percent is None or sl_percent is None:
-                current_atr = atr_percent.iloc[i]
-                tp_pct, sl_pct = MLConfig.get_tp_sl_by_atr(current_atr)
-            else:
-                tp_pct, sl_pct = tp_percent, sl_percent
-            
-            # Calculate TP and SL levels for LONG
-            tp_long = entry_price * (1 + tp_pct / 100)
-            sl_long = entry_price * (1 - sl_pct / 100)
-            
-            # Calculate TP and SL levels for SHORT
-            tp_short = entry_price * (1 - tp_pct / 100)
-            sl_short = entry_price * (1 + sl_pct / 100)
-            
-            # Check next N candles
-            future_highs = df['high'].iloc[i+1:i+1+lookahead]
-            future_lows = df['low'].iloc[i+1:i+1+lookahead]
+            # True range (first candle has no previous close: use high - low)
+            prev_close = np.empty_like(close)
+            prev_close[0] = close[0]
+            prev_close[1:] = close[:-1]
+            true_range = np.maximum(
+                high - low,
+                np.maximum(np.abs(high - prev_close), np.abs(low - prev_close))
+            )
             
-            # LONG scenario: Check if TP hit before SL
-            tp_hit_long = (future_highs >= tp_long).any()
-            sl_hit_long = (future_lows <= sl_long).any()
+            # ATR = 14-candle simple moving average of TR (NaN until the window fills)
+            atr = np.full_like(close, np.nan)
+            if len(true_range) >= 14:
+                atr[13:] = np.convolve(true_range, np.full(14, 1 / 14), mode='valid')
+            atr_percent = (atr / close) * 100
             
-            if tp_hit_long and sl_hit_long:
-                # Both hit, check which came first
-                tp_idx_long = future_highs[future_highs >= tp_long].index[0]
-                sl_idx_long = future_lows[future_lows <= sl_long].index[0]
-                long_success = tp_idx_long < sl_idx_long
-            elif tp_hit_long:
-                long_success = True
-            else:
-                long_success = False
-            
-            # SHORT scenario: Check if TP hit before SL
-            tp_hit_short = (future_lows <= tp_short).any()
-            sl_hit_short = (future_highs >= sl_short).any()
-            
-            if tp_hit_short and sl_hit_short:
-                # Both hit, check which came first
-                tp_idx_short = future_lows[future_lows <= tp_short].index[0]
-                sl_idx_short = future_highs[future_highs >= sl_short].index[0]
-                short_success = tp_idx_short < sl_idx_short
-            elif tp_hit_short:
-                short_success = True
-            else:
-                short_success = False
-            
-            # Label: 1 if at least one direction successful, 0 otherwise
-            # We'll train a model that predicts "tradeable moment" regardless of direction
-            # Direction will be determined by other indicators (MA, trend, etc.)
-            label = 1 if (long_success or short_success) else 0
-            
-            labels.append(label)
+            # Same thresholds as MLConfig.get_tp_sl_by_atr (NaN ATR -> high volatility)
+            low_vol = atr_percent < MLConfig.ATR_LOW_THRESHOLD
+            med_vol = atr_percent < MLConfig.ATR_HIGH_THRESHOLD
+            tp_pct = np.where(low_vol, MLConfig.TP_LOW_VOL,
+                              np.where(med_vol, MLConfig.TP_MED_VOL, MLConfig.TP_HIGH_VOL))
+            sl_pct = np.where(low_vol, MLConfig.SL_LOW_VOL,
+                              np.where(med_vol, MLConfig.SL_MED_VOL, MLConfig.SL_HIGH_VOL))
+        else:
+            tp_pct = np.full(len(df), tp_percent, dtype=np.float64)
+            sl_pct = np.full(len(df), sl_percent, dtype=np.float64)
+        
+        # Label: 1 if at least one direction is successful, 0 otherwise
+        # (the model predicts a "tradeable moment"; direction comes from other indicators)
+        # Can't label last N candles (no lookahead available): -1 = invalid
+        labels = np.full(len(df), -1, dtype=np.int64)
+        _label_kernel(high, low, close, tp_pct.astype(np.float64), sl_pct.astype(np.float64),
+                      lookahead, labels)
         
         df['label'] = labels
         
@@ -146,15 +158,13 @@ class MLEngine:
     
     def prepare_training_data(
         self,
-        df: pd.DataFrame,
-        balance_classes: bool = True
+        df: pd.DataFrame
     ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
         """
         Prepare features and labels for training
         
         Args:
             df: Labeled DataFrame with features
-            balance_classes: Whether to balance positive/negative samples
             
         Returns:
             Tuple of (X, y, feature_names)
@@ -170,17 +180,7 @@ class MLEngine:
         y = df['label'].values
         
         # Handle NaN/Inf
-        X = np.nan_to_num(X, nan=0.0, posinf=1e10, neginf=-1e10)
-        
-        # Balance classes if requested
-        if balance_classes:
-            from imblearn.over_sampling import SMOTE
-            try:
-                smote = SMOTE(random_state=42)
-                X, y = smote.fit_resample(X, y)
-            except:
-                # If SMOTE fails, skip balancing
-                pass
+        X = np.nan_to_num(X, nan=0.0, posinf=1e10, neginf=-1e10).astype(np.float32)
         
         return X, y, feature_cols
     
@@ -188,7 +188,8 @@ class MLEngine:
         self,
         df_labeled: pd.DataFrame,
         validation_split: float = 0.2,
-        save_model: bool = True
+        save_model: bool = True,
+        balance_classes: bool = True
     ) -> Dict:
         """
         Train LightGBM model with time-series walk-forward validation
@@ -197,6 +198,7 @@ class MLEngine:
             df_labeled: DataFrame with features and labels
             validation_split: Fraction of data for validation
             save_model: Whether to save the trained model
+            balance_classes: Weight positive samples by neg/pos ratio (scale_pos_weight)
             
         Returns:
             Dictionary with training metrics
@@ -206,6 +208,7 @@ class MLEngine:
         # Prepare data
         X, y, feature_names = self.prepare_training_data(df_labeled)
         self.feature_names = feature_names
+        self.feature_index = {name: i for i, name in enumerate(feature_names)}
         
         print(f"✅ Features prepared: {len(feature_names)} features")
         print(f"   Positive samples: {sum(y == 1)} ({sum(y == 1)/len(y)*100:.1f}%)")
@@ -216,37 +219,46 @@ class MLEngine:
         X_train, X_val = X[:split_idx], X[split_idx:]
         y_train, y_val = y[:split_idx], y[split_idx:]
         
-        # Scale features
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_val_scaled = self.scaler.transform(X_val)
+        # No feature scaling: tree splits are invariant to monotonic transforms
+        self._scaler_mean = None
+        self._scaler_scale = None
         
         # Train LightGBM
         print("\n🚀 Training LightGBM model...")
         
-        train_data = lgb.Dataset(X_train_scaled, label=y_train)
-        val_data = lgb.Dataset(X_val_scaled, label=y_val, reference=train_data)
+        train_data = lgb.Dataset(X_train, label=y_train, feature_name=feature_names)
+        val_data = lgb.Dataset(X_val, label=y_val, reference=train_data)
+        
+        # Class balancing via LightGBM weights instead of oversampling
+        params = dict(MLConfig.LGBM_PARAMS)
+        if balance_classes:
+            pos_count = int((y_train == 1).sum())
+            neg_count = int((y_train == 0).sum())
+            params['scale_pos_weight'] = neg_count / max(1, pos_count)
+        
+        # Only the validation set is evaluated; per-round logging is opt-in
+        callbacks = [lgb.early_stopping(stopping_rounds=MLConfig.EARLY_STOPPING_ROUNDS,
+                                        first_metric_only=True)]
+        if MLConfig.LOG_EVALUATION_PERIOD > 0:
+            callbacks.append(lgb.log_evaluation(period=MLConfig.LOG_EVALUATION_PERIOD))
         
         self.model = lgb.train(
-            MLConfig.LGBM_PARAMS,
+            params,
             train_data,
-            num_boost_round=500,
-            valid_sets=[train_data, val_data],
-            valid_names=['train', 'val'],
-            callbacks=[
-                lgb.early_stopping(stopping_rounds=50),
-                lgb.log_evaluation(period=50)
-            ]
+            num_boost_round=MLConfig.NUM_BOOST_ROUND,
+            valid_sets=[val_data],
+            valid_names=['val'],
+            callbacks=callbacks
         )
         
         # Evaluate
         print("\n📈 Evaluating model...")
         
-        y_train_pred = (self.model.predict(X_train_scaled) > 0.5).astype(int)
-        y_val_pred = (self.model.predict(X_val_scaled) > 0.5).astype(int)
+        y_train_proba = self.model.predict(X_train)
+        y_val_proba = self.model.predict(X_val)
         
-        y_train_proba = self.model.predict(X_train_scaled)
-        y_val_proba = self.model.predict(X_val_scaled)
+        y_train_pred = (y_train_proba > 0.5).astype(int)
+        y_val_pred = (y_val_proba > 0.5).astype(int)
         
         metrics = {
             'train_accuracy': accuracy_score(y_train, y_train_pred),
@@ -257,6 +269,7 @@ class MLEngine:
             'train_samples': len(y_train),
             'val_samples': len(y_val),
             'num_features': len(feature_names),
+            'scaled_features': False,
             'training_date': datetime.now().isoformat()
         }
         
@@ -279,6 +292,9 @@ class MLEngine:
         """
         Predict probability for a single set of features
         
+        Kept for compatibility; callers on a hot path should build the
+        vector in ``feature_names`` order and use predict_from_array().
+        
         Args:
             features: Dictionary of feature_name -> value
             
@@ -288,21 +304,68 @@ class MLEngine:
         if self.model is None:
             raise ValueError("Model not loaded. Train or load a model first.")
         
-        # Create feature vector in correct order
-        X = np.array([features.get(fname, 0) for fname in self.feature_names])
-        X = X.reshape(1, -1)
+        x = np.fromiter(
+            (features.get(fname, 0.0) for fname in self.feature_names),
+            dtype=np.float32,
+            count=len(self.feature_names)
+        )
+        probabilities, predictions = self.predict_from_array(x)
+        return float(probabilities[0]), int(predictions[0])
+    
+    def predict_from_array(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict from feature vectors already laid out in feature_names order
+        
+        Use self.feature_index to map feature names to column positions.
+        
+        Args:
+            x: Array of shape (n_features,) or (rows, n_features)
+            
+        Returns:
+            Tuple of (probabilities, predictions) arrays, one entry per row
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Train or load a model first.")
+        
+        # Copy to float32 so the in-place cleanup never touches the caller's array
+        X = np.array(x, dtype=np.float32, ndmin=2)
         
         # Handle NaN/Inf
-        X = np.nan_to_num(X, nan=0.0, posinf=1e10, neginf=-1e10)
+        np.nan_to_num(X, copy=False, nan=0.0, posinf=1e10, neginf=-1e10)
         
-        # Scale
-        X_scaled = self.scaler.transform(X)
+        # Legacy models expect StandardScaler-ed input (scaled in place)
+        if self._scaler_mean is not None:
+            np.subtract(X, self._scaler_mean, out=X)
+            np.divide(X, self._scaler_scale, out=X)
         
         # Predict
-        probability = self.model.predict(X_scaled)[0]
-        prediction = 1 if probability > 0.5 else 0
+        probabilities = self.model.predict(X)
+        predictions = (probabilities > 0.5).astype(np.int8)
         
-        return probability, prediction
+        return probabilities, predictions
+    
+    def predict_batch(self, features_list: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict probabilities for many feature sets with a single model call
+        
+        Args:
+            features_list: List of dictionaries of feature_name -> value
+            
+        Returns:
+            Tuple of (probabilities, predictions) arrays, one entry per row
+        """
+        if self.model is None:
+            raise ValueError("Model not loaded. Train or load a model first.")
+        
+        # Create (rows, features) matrix in correct feature order
+        num_features = len(self.feature_names)
+        X = np.fromiter(
+            (features.get(fname, 0) for features in features_list for fname in self.feature_names),
+            dtype=np.float32,
+            count=len(features_list) * num_features
+        ).reshape(len(features_list), num_features)
+        
+        return self.predict_from_array(X)
     
     def get_feature_importance(self, top_n: int = 20) -> Dict[str, float]:
         """
@@ -328,70 +391,85 @@ class MLEngine:
         return dict(sorted_features)
     
     def save_model(self):
-        """Save model, scaler, feature names, and metadata"""
-        print(f"\n💾 Saving model to {MLConfig.LATEST_MODEL_DIR}...")
+        """Save model, feature names, and metadata"""
+        logger.info("Saving model to %s", MLConfig.LATEST_MODEL_DIR)
         
-        # Save model
+        # Save model (only trees up to the early-stopping best iteration)
         model_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'model.txt')
-        self.model.save_model(model_path)
-        
-        # Save scaler
-        scaler_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'scaler.pkl')
-        joblib.dump(self.scaler, scaler_path)
+        self.model.save_model(model_path, num_iteration=self.model.best_iteration)
         
         # Save feature names
         features_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'feature_names.json')
-        with open(features_path, 'w') as f:
-            json.dump(self.feature_names, f)
+        with open(features_path, 'wb') as f:
+            f.write(orjson.dumps(self.feature_names))
         
         # Save metadata
         metadata_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'metadata.json')
-        with open(metadata_path, 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        with open(metadata_path, 'wb') as f:
+            f.write(orjson.dumps(self.metadata, option=_METADATA_JSON_OPTIONS))
         
         # Archive copy with timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         archive_dir = os.path.join(MLConfig.ARCHIVE_MODEL_DIR, f'model_{timestamp}')
         os.makedirs(archive_dir, exist_ok=True)
         
-        self.model.save_model(os.path.join(archive_dir, 'model.txt'))
-        joblib.dump(self.scaler, os.path.join(archive_dir, 'scaler.pkl'))
+        self.model.save_model(os.path.join(archive_dir, 'model.txt'),
+                              num_iteration=self.model.best_iteration)
         
-        with open(os.path.join(archive_dir, 'feature_names.json'), 'w') as f:
-            json.dump(self.feature_names, f)
+        with open(os.path.join(archive_dir, 'feature_names.json'), 'wb') as f:
+            f.write(orjson.dumps(self.feature_names))
         
-        with open(os.path.join(archive_dir, 'metadata.json'), 'w') as f:
-            json.dump(self.metadata, f, indent=2)
+        with open(os.path.join(archive_dir, 'metadata.json'), 'wb') as f:
+            f.write(orjson.dumps(self.metadata, option=_METADATA_JSON_OPTIONS))
         
-        print(f"✅ Model saved successfully!")
+        logger.info("Model saved (archive: %s)", archive_dir)
     
     def load_model(self):
         """Load latest trained model"""
         model_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'model.txt')
-        scaler_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'scaler.pkl')
+        scaler_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'scaler.npz')
+        legacy_scaler_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'scaler.pkl')
         features_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'feature_names.json')
         metadata_path = os.path.join(MLConfig.LATEST_MODEL_DIR, 'metadata.json')
         
         if not os.path.exists(model_path):
-            print("⚠️  No trained model found. Train a model first.")
+            logger.warning("No trained model found at %s. Train a model first.", model_path)
             return False
         
         try:
             self.model = lgb.Booster(model_file=model_path)
-            self.scaler = joblib.load(scaler_path)
             
-            with open(features_path, 'r') as f:
-                self.feature_names = json.load(f)
+            with open(features_path, 'rb') as f:
+                self.feature_names = orjson.loads(f.read())
+            self.feature_index = {name: i for i, name in enumerate(self.feature_names)}
+            
+            with open(metadata_path, 'rb') as f:
+                self.metadata = orjson.loads(f.read())
             
-            with open(metadata_path, 'r') as f:
-                self.metadata = json.load(f)
+            # Legacy models were trained on StandardScaler-ed features
+            self._scaler_mean = None
+            self._scaler_scale = None
+            if self.metadata.get('scaled_features', True):
+                if os.path.exists(scaler_path):
+                    scaler_params = np.load(scaler_path)
+                    mean, scale = scaler_params['mean'], scaler_params['scale']
+                else:
+                    scaler = joblib.load(legacy_scaler_path)
+                    mean, scale = scaler.mean_, scaler.scale_
+                self._scaler_mean = mean.astype(np.float32)
+                self._scaler_scale = scale.astype(np.float32)
+                logger.warning("Model at %s was trained on scaled features (legacy format); "
+                               "scaling inputs at predict time. Retrain it with train_model.py.",
+                               model_path)
             
-            print(f"✅ Model loaded successfully!")
-            print(f"   Trained: {self.metadata.get('training_date', 'Unknown')}")
-            print(f"   Val Accuracy: {self.metadata.get('val_accuracy', 0):.4f}")
-            print(f"   Val ROC-AUC: {self.metadata.get('val_roc_auc', 0):.4f}")
+            logger.info(
+                "Model loaded (trained: %s, val accuracy: %.4f, val ROC-AUC: %.4f)",
+                self.metadata.get('training_date', 'Unknown'),
+                self.metadata.get('val_accuracy', 0),
+                self.metadata.get('val_roc_auc', 0)
+            )
             
             return True
         except Exception as e:
-            print(f"❌ Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             return False
@@ -6,14 +6,97 @@ Based on friend's trading strategy:
 - Revisar velas de 15m: 3+ velas del mismo color = confirmación de cambio de tendencia
 """
 
-from dataclasses import dataclass
-from typing import Optional, Dict, List
-from enum import Enum
-import pandas as pd
-from src.technical_analysis import TechnicalAnalyzer, SignalType
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import timedelta
+from enum import IntEnum
+from typing import Optional, Dict, List, Sequence, Tuple
+from joblib import Memory
+from src.config import config
+from src.technical_analysis import TechnicalAnalyzer, SignalType, _TIMEFRAME_ERRORS
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# __slots__ en dataclasses requiere Python 3.10+; en 3.9 se usa __dict__ normal
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+# Cache de análisis por símbolo mientras la vela de 15m en curso no cierre
+_CANDLE_15M_SECONDS = 15 * 60
+_MTF_CACHE_TTL = 60  # segundos; los indicadores de la vela abierta siguen moviéndose
+_MTF_CACHE_MAXSIZE = 256
+# La vela 15m en curso trae el último precio; si llega más atrasada que esto se pide el ticker
+_PRICE_MAX_LAG = 60  # segundos
+
+# 1H/4H apenas cambian dentro de su vela: se reutilizan sin volver a descargar
+# mientras no abra una vela nueva de ese timeframe y no pase el TTL
+_TIMEFRAME_SECONDS = {'1h': 60 * 60, '4h': 4 * 60 * 60}
+_TF_CACHE_TTL = {'1h': 5 * 60, '4h': 15 * 60}
+_TICKER_CACHE_TTL = 2.0  # segundos
+
+
+def _candle_open(timeframe: str, now: float) -> int:
+    """Apertura (epoch s) de la vela en curso de un timeframe de tendencia (1h/4h)"""
+    period = _TIMEFRAME_SECONDS[timeframe]
+    return int(now // period) * period
+
+
+def _trend_entry_fresh(timeframe: str, cached_open: int, stored_at: float, now: float) -> bool:
+    """Una entrada de cache 1H/4H sigue válida: misma vela abierta y dentro del TTL"""
+    return (cached_open == _candle_open(timeframe, now)
+            and time.monotonic() - stored_at <= _TF_CACHE_TTL[timeframe])
+
+# Copia en disco de la cache 1H/4H: sobrevive a reinicios del bot
+_DISK_CACHE_BYTES = 200 << 20
+_DISK_CACHE_MAX_AGE = timedelta(days=1)
+
+# Velas por timeframe: EMA200 + margen de calentamiento. Explícito para no
+# depender de CANDLES_LIMIT (pensado para el timeframe por defecto)
+_OHLCV_LIMIT = 220
+
+# Hilos para analyze_many (cada análisis hace hasta 3 peticiones OHLCV)
+_SCAN_MAX_WORKERS = 8
+# Hilos compartidos para descargar 1H/4H en paralelo (2 por análisis simultáneo)
+_TF_MAX_WORKERS = 2 * _SCAN_MAX_WORKERS
+
+# Compartido por todos los análisis sin advertencias (el caso común)
+_EMPTY_WARNINGS: tuple = ()
+
+
+class TrendSide(IntEnum):
+    """Trend side of a timeframe (small int: cheap to store, hash and index)"""
+    NONE = 0
+    BULLISH = 1
+    BEARISH = 2
+
+
+def _trend_side(name: str) -> TrendSide:
+    """Convert a candle dict 'trend_change' value ('BULLISH'/'BEARISH'/'NONE')"""
+    return TrendSide.__members__.get(name, TrendSide.NONE)
+
+
+# Texto de TechnicalAnalyzer.analyze_trend -> lado ('LATERAL' -> NONE)
+_TREND_TEXT_SIDE = {'ALCISTA': TrendSide.BULLISH, 'BAJISTA': TrendSide.BEARISH}
+
+# Pares de lados opuestos (ninguno NONE)
+_OPPOSED_SIDES = frozenset({
+    (TrendSide.BULLISH, TrendSide.BEARISH),
+    (TrendSide.BEARISH, TrendSide.BULLISH),
+})
+
+# (velas 15m, velas 4H) opuestas -> advertencia
+_15M_VS_4H_WARNING = {
+    (TrendSide.BULLISH, TrendSide.BEARISH): "⚠️ 15m alcista pero 4H bajista",
+    (TrendSide.BEARISH, TrendSide.BULLISH): "⚠️ 15m bajista pero 4H alcista",
+}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class TimeframeData:
     """Data for a single timeframe analysis"""
     timeframe: str
@@ -28,11 +111,40 @@ class TimeframeData:
     # Candle color trend data
     candle_colors: str = ''  # Visual: 🟢🟢🟢🔴🔴🔴
     consecutive_same: int = 0  # Number of consecutive same color
-    candle_trend: str = 'NONE'  # BULLISH, BEARISH, or NONE
+    candle_trend: TrendSide = TrendSide.NONE  # From 3+ same color candles
     candle_confirmed: bool = False  # True if 3+ same color
+    # Derived: trend text alone, and trend text + MA7/MA25
+    trend_text_side: TrendSide = field(init=False, repr=False, default=TrendSide.NONE)
+    trend_side: TrendSide = field(init=False, repr=False, default=TrendSide.NONE)
+    
+    def __post_init__(self):
+        self.trend_text_side = _TREND_TEXT_SIDE.get(self.trend, TrendSide.NONE)
+        if self.trend_text_side == TrendSide.BULLISH or self.ma7 > self.ma25:
+            self.trend_side = TrendSide.BULLISH
+        elif self.trend_text_side == TrendSide.BEARISH or self.ma7 < self.ma25:
+            self.trend_side = TrendSide.BEARISH
+        else:
+            self.trend_side = TrendSide.NONE
 
 
-@dataclass
+# Icono y texto para el mensaje de Telegram, indexado por TrendSide
+_SIDE_DISPLAY = (
+    ('▬', 'LATERAL'),   # NONE
+    ('▲', 'ALCISTA'),   # BULLISH
+    ('▼', 'BAJISTA'),   # BEARISH
+)
+
+
+def _display_side(tf: TimeframeData) -> TrendSide:
+    """Lado mostrado: el color de velas manda, luego el texto de tendencia"""
+    if tf.candle_trend == TrendSide.BULLISH or tf.trend_text_side == TrendSide.BULLISH:
+        return TrendSide.BULLISH
+    if tf.candle_trend == TrendSide.BEARISH or tf.trend_text_side == TrendSide.BEARISH:
+        return TrendSide.BEARISH
+    return TrendSide.NONE
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class MTFAnalysis:
     """Results of multi-timeframe analysis with MA7/MA25 strategy"""
     symbol: str
@@ -60,7 +172,64 @@ class MTFAnalysis:
     trade_direction: str  # 'LONG', 'SHORT', or 'NEUTRAL'
     confidence: int  # Percentage based on alignment
     reason: str
-    warnings: List[str]
+    warnings: Sequence[str]
+    # 1H/4H no se consultaron porque 15m no mostró señal (no es un fallo de datos)
+    trend_tfs_skipped: bool = False
+
+
+def _build_decision_table() -> dict:
+    """
+    Precompute every _make_decision outcome.
+    
+    Key: (summary_signal, candle_confirmed, trend_4h, trend_1h)
+    Value: (should_trade, direction, confidence, reason, use_summary_reason)
+    where reason is the fallback when the grouped summary has none.
+    """
+    sides = (
+        # señal, dirección, tendencia alineada, razón fuerte, razón moderada, razón sin velas
+        ('BUY', 'LONG', TrendSide.BULLISH, 'Ambos grupos confirman FUERTE COMPRA', 'Grupos confirman COMPRA',
+         'Indicadores alcistas pero falta confirmación de velas'),
+        ('SELL', 'SHORT', TrendSide.BEARISH, 'Ambos grupos confirman FUERTE VENTA', 'Grupos confirman VENTA',
+         'Indicadores bajistas pero falta confirmación de velas'),
+    )
+    trends = tuple(TrendSide)
+    table = {}
+    
+    for signal, direction, side, strong_reason, weak_reason, unconfirmed_reason in sides:
+        for confirmed in (True, False):
+            for trend_4h in trends:
+                for trend_1h in trends:
+                    aligned = trend_4h == side and trend_1h == side
+                    
+                    # Ambos grupos FUERTES: la confianza depende de velas y 4H/1H
+                    if confirmed and aligned:
+                        confidence = 95
+                    elif confirmed:
+                        confidence = 80
+                    elif aligned:
+                        confidence = 75
+                    else:
+                        confidence = 65
+                    table[('STRONG_' + signal, confirmed, trend_4h, trend_1h)] = (
+                        True, direction, confidence, strong_reason, True
+                    )
+                    
+                    # Un grupo fuerte y otro moderado: solo con confirmación de velas
+                    if confirmed:
+                        table[(signal, confirmed, trend_4h, trend_1h)] = (
+                            True, direction, 60, weak_reason, True
+                        )
+                    else:
+                        table[(signal, confirmed, trend_4h, trend_1h)] = (
+                            False, 'NEUTRAL', 40, unconfirmed_reason, False
+                        )
+    
+    return table
+
+
+_DECISION_TABLE = _build_decision_table()
+# Sin señal fuerte de los indicadores
+_DECISION_WAIT = (False, 'NEUTRAL', 30, 'Grupos no alineados - ESPERAR', True)
 
 
 class MultiTimeframeAnalyzer:
@@ -74,8 +243,208 @@ class MultiTimeframeAnalyzer:
     def __init__(self, client):
         self.client = client
         self.primary_tf = '15m'
+        # symbol -> (apertura de la última vela 15m, time.monotonic() al guardar, análisis)
+        self._cache: OrderedDict = OrderedDict()
+        # (symbol, timeframe) -> (apertura de la vela, time.monotonic(), TimeframeData)
+        self._tf_cache: OrderedDict = OrderedDict()
+        # symbol -> (huella de la última vela 15m, resultado de _analyze_15m)
+        self._15m_cache: OrderedDict = OrderedDict()
+        # symbol -> (time.monotonic(), ticker)
+        self._ticker_cache: Dict[str, Tuple[float, dict]] = {}
+        self._cache_lock = threading.Lock()  # analyze_many usa varios hilos
+        # Sin MTF_DISK_CACHE_DIR (vacío) joblib no guarda nada
+        self._disk_cache = Memory(config.MTF_DISK_CACHE_DIR or None, verbose=0)
+        self._disk_cache.reduce_size(bytes_limit=_DISK_CACHE_BYTES, age_limit=_DISK_CACHE_MAX_AGE)
+        self._compute_trend_tf = self._disk_cache.cache(self._compute_trend_tf_uncached, ignore=['self'])
+        # Un solo pool para 1H/4H en vez de crear hilos en cada análisis
+        self._tf_executor = ThreadPoolExecutor(
+            max_workers=_TF_MAX_WORKERS, thread_name_prefix="mtf-tf"
+        )
+    
+    def _get_cached(self, symbol: str, ticker: Optional[dict] = None) -> Optional[MTFAnalysis]:
+        """Return a fresh cached analysis for symbol (with live price), or None"""
+        current_candle_open = int(time.time() // _CANDLE_15M_SECONDS) * _CANDLE_15M_SECONDS
+        with self._cache_lock:
+            entry = self._cache.get(symbol)
+            if entry is None:
+                return None
+            
+            candle_open, stored_at, result = entry
+            if candle_open != current_candle_open or time.monotonic() - stored_at > _MTF_CACHE_TTL:
+                del self._cache[symbol]
+                return None
+            
+            self._cache.move_to_end(symbol)
+        
+        if ticker is None:
+            ticker = self._get_ticker(symbol)
+        return replace(result, price=ticker['price'])
     
-    def analyze(self, symbol: str) -> MTFAnalysis:
+    def _store_cached(self, symbol: str, last_candle_time, result: MTFAnalysis):
+        """Remember result keyed by the open time of the latest 15m candle (LRU bounded)"""
+        candle_open = int(last_candle_time.timestamp())
+        with self._cache_lock:
+            self._cache[symbol] = (candle_open, time.monotonic(), result)
+            self._cache.move_to_end(symbol)
+            if len(self._cache) > _MTF_CACHE_MAXSIZE:
+                self._cache.popitem(last=False)
+    
+    def _get_ticker(self, symbol: str) -> dict:
+        """Ticker memoized for _TICKER_CACHE_TTL seconds (back-to-back analyses)"""
+        with self._cache_lock:
+            entry = self._ticker_cache.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < _TICKER_CACHE_TTL:
+            return entry[1]
+        
+        ticker = self.client.get_ticker(symbol)
+        with self._cache_lock:
+            self._ticker_cache[symbol] = (time.monotonic(), ticker)
+        return ticker
+    
+    def _load_trend_tf(self, symbol: str, timeframe: str) -> TimeframeData:
+        """
+        TimeframeData for a trend timeframe (1h/4h), cached per (symbol, timeframe, open candle)
+        
+        Runs in a worker thread. On a hit (in memory, then on disk) neither
+        the candles are fetched nor the indicators recalculated.
+        """
+        key = (symbol, timeframe)
+        now = time.time()
+        candle_open = _candle_open(timeframe, now)
+        with self._cache_lock:
+            entry = self._tf_cache.get(key)
+            if entry is not None:
+                cached_open, stored_at, tf_data = entry
+                if _trend_entry_fresh(timeframe, cached_open, stored_at, now):
+                    self._tf_cache.move_to_end(key)
+                    return tf_data
+        
+        ttl_slot = int(now // _TF_CACHE_TTL[timeframe])
+        tf_data = self._compute_trend_tf(symbol, timeframe, candle_open, ttl_slot)
+        with self._cache_lock:
+            self._tf_cache[key] = (candle_open, time.monotonic(), tf_data)
+            self._tf_cache.move_to_end(key)
+            if len(self._tf_cache) > 2 * _MTF_CACHE_MAXSIZE:
+                self._tf_cache.popitem(last=False)
+        return tf_data
+    
+    def _compute_trend_tf_uncached(self, symbol: str, timeframe: str,
+                                   candle_open: int, ttl_slot: int) -> TimeframeData:
+        """Fetch and build trend TimeframeData (candle_open/ttl_slot only key the disk cache)"""
+        return self._build_tf_data(self._load_analyzer(symbol, timeframe), timeframe)[0]
+    
+    def _load_15m(self, symbol: str) -> tuple:
+        """
+        Fetch 15m candles and derive the entry-timeframe data (runs in a worker thread)
+        
+        Closed candles never change, so when the latest candle (time and OHLCV)
+        is identical to the previous call the indicators are not recalculated.
+        
+        Returns:
+            (TimeframeData, candle color dict, MA crossover dict, tv_votes,
+             grouped_votes, open time of the latest candle, its close)
+        """
+        df = self.client.get_ohlcv(symbol, '15m', limit=_OHLCV_LIMIT)
+        fingerprint = (len(df),) + tuple(df.iloc[-1])
+        with self._cache_lock:
+            entry = self._15m_cache.get(symbol)
+            if entry is not None and entry[0] == fingerprint:
+                self._15m_cache.move_to_end(symbol)
+                return entry[1]
+        
+        analyzer = TechnicalAnalyzer(df)
+        analyzer.calculate_all_indicators()
+        tf_data, candle, ma = self._build_tf_data(analyzer, '15m', check_volume=True)
+        result = (
+            tf_data, candle, ma,
+            analyzer.get_tradingview_votes(),
+            analyzer.get_grouped_tradingview_votes(),
+            df['timestamp'].iloc[-1],
+            float(df['close'].iloc[-1]),
+        )
+        with self._cache_lock:
+            self._15m_cache[symbol] = (fingerprint, result)
+            self._15m_cache.move_to_end(symbol)
+            if len(self._15m_cache) > _MTF_CACHE_MAXSIZE:
+                self._15m_cache.popitem(last=False)
+        return result
+    
+    def _load_analyzer(self, symbol: str, timeframe: str) -> TechnicalAnalyzer:
+        """Fetch candles and calculate indicators for one timeframe (runs in a worker thread)"""
+        analyzer = TechnicalAnalyzer(self.client.get_ohlcv(symbol, timeframe, limit=_OHLCV_LIMIT))
+        analyzer.calculate_all_indicators()
+        return analyzer
+    
+    def _build_tf_data(self, analyzer: TechnicalAnalyzer, timeframe: str,
+                       check_volume: bool = False) -> Tuple[TimeframeData, dict, dict]:
+        """
+        Build TimeframeData for one timeframe from its (indicator-ready) analyzer
+        
+        Args:
+            analyzer: TechnicalAnalyzer with indicators calculated
+            timeframe: '15m', '1h' or '4h'
+            check_volume: Evaluate volume ratio (only the 15m entry timeframe does)
+            
+        Returns:
+            Tuple of (TimeframeData, candle color dict, MA crossover dict)
+        """
+        ma = analyzer.detect_ma_crossover()
+        candle = analyzer.detect_candle_color_trend(lookback=6)
+        analysis = analyzer.generate_analysis()
+        ind = analysis['indicators']
+        
+        volume_ok = True
+        if check_volume:
+            volume_ratio = ind.get('volume_ratio')
+            volume_ok = bool(volume_ratio > 1.0) if volume_ratio else True
+        
+        # Escalares nativos (no numpy): más compactos en las caches y más rápidos de comparar
+        tf_data = TimeframeData(
+            timeframe=timeframe,
+            score=analysis['score'],
+            signal=analysis['signal'],
+            trend=analysis['trend']['direction'],
+            rsi=float(ind.get('rsi') or 50),
+            macd_bullish=bool((ind.get('macd') or 0) > 0),
+            volume_ok=volume_ok,
+            ma7=float(ma['ma7']),
+            ma25=float(ma['ma25']),
+            candle_colors=candle['candle_colors'],
+            consecutive_same=max(candle['consecutive_green'], candle['consecutive_red']),
+            candle_trend=_trend_side(candle['trend_change']),
+            candle_confirmed=candle['confirmed']
+        )
+        return tf_data, candle, ma
+    
+    def analyze_many(self, symbols: List[str], max_workers: int = _SCAN_MAX_WORKERS) -> List[MTFAnalysis]:
+        """
+        Analyze many symbols concurrently with a single bulk ticker request
+        
+        Args:
+            symbols: Trading pairs to analyze
+            max_workers: Concurrent analyses (keep within exchange rate limits)
+            
+        Returns:
+            MTFAnalysis list in the order of symbols; failed symbols are skipped
+        """
+        tickers = self.client.get_tickers(symbols)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (symbol, executor.submit(self.analyze, symbol, tickers.get(symbol), True))
+                for symbol in symbols
+            ]
+        
+        results = []
+        for symbol, future in futures:
+            try:
+                results.append(future.result())
+            except _TIMEFRAME_ERRORS as e:
+                logger.debug("MTF analysis failed for %s: %s", symbol, e)
+        return results
+    
+    def analyze(self, symbol: str, ticker: Optional[dict] = None,
+                skip_quiet_trends: bool = False) -> MTFAnalysis:
         """
         Analyze symbol using Multi-Timeframe Candle Color strategy
         
@@ -83,98 +452,58 @@ class MultiTimeframeAnalyzer:
         1. Revisar velas de 4H (tendencia principal)
         2. Revisar velas de 1H (confirmación intermedia)
         3. Revisar velas de 15m: 3+ velas del mismo color = cambio confirmado
+        
+        Args:
+            symbol: Trading pair
+            ticker: Pre-fetched ticker (e.g. from get_tickers); fetched if None
+            skip_quiet_trends: Skip the 1H/4H fetch when 15m has no signal
+                (bulk scan only; explicit requests always get every timeframe)
         """
+        cached = self._get_cached(symbol, ticker)
+        if cached is not None and (skip_quiet_trends or not cached.trend_tfs_skipped):
+            return cached
+        
+        # With skip_quiet_trends, 1H/4H are only fetched when 15m shows something
+        (tf_15m_data, candle_15m, ma_crossover, tv_votes, grouped_votes,
+         last_candle_time, last_close) = self._load_15m(symbol)
         
         # ========== 15M ANALYSIS (CONFIRMATION) ==========
-        df_15m = self.client.get_ohlcv(symbol, '15m')
-        analyzer_15m = TechnicalAnalyzer(df_15m)
-        analyzer_15m.calculate_all_indicators()
-        
-        ma_crossover = analyzer_15m.detect_ma_crossover()
-        tv_votes = analyzer_15m.get_tradingview_votes()
-        grouped_votes = analyzer_15m.get_grouped_tradingview_votes()
-        candle_15m = analyzer_15m.detect_candle_color_trend(lookback=6)
-        analysis_15m = analyzer_15m.generate_analysis()
-        
-        tf_15m_data = TimeframeData(
-            timeframe='15m',
-            score=analysis_15m['score'],
-            signal=analysis_15m['signal'],
-            trend=analysis_15m['trend']['direction'],
-            rsi=analysis_15m['indicators']['rsi'] if analysis_15m['indicators']['rsi'] else 50,
-            macd_bullish=analysis_15m['indicators']['macd'] > 0 if analysis_15m['indicators']['macd'] else False,
-            volume_ok=analysis_15m['indicators']['volume_ratio'] > 1.0 if analysis_15m['indicators']['volume_ratio'] else True,
-            ma7=ma_crossover['ma7'],
-            ma25=ma_crossover['ma25'],
-            candle_colors=candle_15m['candle_colors'],
-            consecutive_same=max(candle_15m['consecutive_green'], candle_15m['consecutive_red']),
-            candle_trend=candle_15m['trend_change'],
-            candle_confirmed=candle_15m['confirmed']
+        
+        # Sin señal en 15m (indicadores neutrales y sin cambio de velas):
+        # _make_decision devuelve ESPERAR sin mirar 1H/4H, así que en el escaneo
+        # masivo no se descargan
+        no_signal_15m = skip_quiet_trends and (
+            grouped_votes.get('summary', {}).get('signal', 'NEUTRAL') == 'NEUTRAL'
+            and candle_15m['trend_change'] == 'NONE'
         )
         
-        # ========== 1H ANALYSIS (INTERMEDIATE) ==========
         tf_1h_data = None
-        candle_1h = {'trend_change': 'NONE', 'confirmed': False, 'candle_colors': '', 'consecutive_green': 0, 'consecutive_red': 0}
-        
-        try:
-            df_1h = self.client.get_ohlcv(symbol, '1h')
-            analyzer_1h = TechnicalAnalyzer(df_1h)
-            analyzer_1h.calculate_all_indicators()
-            ma_1h = analyzer_1h.detect_ma_crossover()
-            candle_1h = analyzer_1h.detect_candle_color_trend(lookback=6)
-            analysis_1h = analyzer_1h.generate_analysis()
-            
-            tf_1h_data = TimeframeData(
-                timeframe='1h',
-                score=analysis_1h['score'],
-                signal=analysis_1h['signal'],
-                trend=analysis_1h['trend']['direction'],
-                rsi=analysis_1h['indicators']['rsi'] if analysis_1h['indicators']['rsi'] else 50,
-                macd_bullish=analysis_1h['indicators']['macd'] > 0 if analysis_1h['indicators']['macd'] else False,
-                volume_ok=True,
-                ma7=ma_1h['ma7'],
-                ma25=ma_1h['ma25'],
-                candle_colors=candle_1h['candle_colors'],
-                consecutive_same=max(candle_1h['consecutive_green'], candle_1h['consecutive_red']),
-                candle_trend=candle_1h['trend_change'],
-                candle_confirmed=candle_1h['confirmed']
-            )
-        except:
-            pass
-        
-        # ========== 4H ANALYSIS (MAIN TREND) ==========
         tf_4h_data = None
-        candle_4h = {'trend_change': 'NONE', 'confirmed': False, 'candle_colors': '', 'consecutive_green': 0, 'consecutive_red': 0}
-        
-        try:
-            df_4h = self.client.get_ohlcv(symbol, '4h')
-            analyzer_4h = TechnicalAnalyzer(df_4h)
-            analyzer_4h.calculate_all_indicators()
-            ma_4h = analyzer_4h.detect_ma_crossover()
-            candle_4h = analyzer_4h.detect_candle_color_trend(lookback=6)
-            analysis_4h = analyzer_4h.generate_analysis()
+        
+        if not no_signal_15m:
+            future_1h = self._tf_executor.submit(self._load_trend_tf, symbol, '1h')
+            future_4h = self._tf_executor.submit(self._load_trend_tf, symbol, '4h')
             
-            tf_4h_data = TimeframeData(
-                timeframe='4h',
-                score=analysis_4h['score'],
-                signal=analysis_4h['signal'],
-                trend=analysis_4h['trend']['direction'],
-                rsi=analysis_4h['indicators']['rsi'] if analysis_4h['indicators']['rsi'] else 50,
-                macd_bullish=analysis_4h['indicators']['macd'] > 0 if analysis_4h['indicators']['macd'] else False,
-                volume_ok=True,
-                ma7=ma_4h['ma7'],
-                ma25=ma_4h['ma25'],
-                candle_colors=candle_4h['candle_colors'],
-                consecutive_same=max(candle_4h['consecutive_green'], candle_4h['consecutive_red']),
-                candle_trend=candle_4h['trend_change'],
-                candle_confirmed=candle_4h['confirmed']
-            )
-        except:
-            pass
-        
-        # Get current price
-        ticker = self.client.get_ticker(symbol)
-        current_price = ticker['price']
+            # ========== 1H ANALYSIS (INTERMEDIATE) ==========
+            try:
+                tf_1h_data = future_1h.result()
+            except _TIMEFRAME_ERRORS as e:
+                logger.warning("1h analysis unavailable for %s: %s", symbol, e)
+            
+            # ========== 4H ANALYSIS (MAIN TREND) ==========
+            try:
+                tf_4h_data = future_4h.result()
+            except _TIMEFRAME_ERRORS as e:
+                logger.warning("4h analysis unavailable for %s: %s", symbol, e)
+        
+        # Get current price: the open 15m candle's close is the last trade,
+        # so the ticker is only requested when the candles lag behind
+        if ticker is not None:
+            current_price = ticker['price']
+        elif time.time() - last_candle_time.timestamp() <= _CANDLE_15M_SECONDS + _PRICE_MAX_LAG:
+            current_price = last_close
+        else:
+            current_price = self._get_ticker(symbol)['price']
         
         # Make trading decision using NEW grouped indicators + candle strategy
         should_trade, direction, confidence, reason = self._make_decision(
@@ -184,7 +513,7 @@ class MultiTimeframeAnalyzer:
         # Collect warnings
         warnings = self._collect_warnings(tf_4h_data, tf_1h_data, tf_15m_data, candle_15m)
         
-        return MTFAnalysis(
+        result = MTFAnalysis(
             symbol=symbol,
             price=current_price,
             tf_15m=tf_15m_data,
@@ -198,8 +527,11 @@ class MultiTimeframeAnalyzer:
             trade_direction=direction,
             confidence=confidence,
             reason=reason,
-            warnings=warnings
+            warnings=warnings,
+            trend_tfs_skipped=no_signal_15m,
         )
+        self._store_cached(symbol, last_candle_time, result)
+        return result
     
     def _make_decision(self, tf_4h: Optional[TimeframeData], tf_1h: Optional[TimeframeData], 
                        tf_15m: Optional[TimeframeData], candle_15m: dict, grouped_votes: dict) -> tuple:
@@ -217,115 +549,86 @@ class MultiTimeframeAnalyzer:
         
         # Get grouped indicators summary
         summary = grouped_votes.get('summary', {})
-        osc_signal = grouped_votes.get('oscillators', {}).get('signal', 'NEUTRAL')
-        ma_signal = grouped_votes.get('moving_averages', {}).get('signal', 'NEUTRAL')
         summary_signal = summary.get('signal', 'NEUTRAL')
         
         # Get 15m candle confirmation
-        candle_trend = candle_15m.get('trend_change', 'NONE')
-        candle_confirmed = candle_15m.get('confirmed', False)
-        consecutive = max(candle_15m.get('consecutive_green', 0), candle_15m.get('consecutive_red', 0))
+        candle_confirmed = bool(candle_15m.get('confirmed', False))
         
         # Determine 4H and 1H trends
-        trend_4h = 'NONE'
-        trend_1h = 'NONE'
-        
-        if tf_4h:
-            if 'ALCISTA' in tf_4h.trend or tf_4h.ma7 > tf_4h.ma25:
-                trend_4h = 'BULLISH'
-            elif 'BAJISTA' in tf_4h.trend or tf_4h.ma7 < tf_4h.ma25:
-                trend_4h = 'BEARISH'
-        
-        if tf_1h:
-            if 'ALCISTA' in tf_1h.trend or tf_1h.ma7 > tf_1h.ma25:
-                trend_1h = 'BULLISH'
-            elif 'BAJISTA' in tf_1h.trend or tf_1h.ma7 < tf_1h.ma25:
-                trend_1h = 'BEARISH'
-        
-        # Calculate confidence based on alignment
-        alignment_score = 0
-        if trend_4h == 'BULLISH' and candle_trend == 'BULLISH':
-            alignment_score += 35
-        elif trend_4h == 'BEARISH' and candle_trend == 'BEARISH':
-            alignment_score += 35
-        
-        if trend_1h == 'BULLISH' and candle_trend == 'BULLISH':
-            alignment_score += 25
-        elif trend_1h == 'BEARISH' and candle_trend == 'BEARISH':
-            alignment_score += 25
-        
-        if candle_confirmed:
-            alignment_score += 40
-        
-        confidence = min(alignment_score, 100)
-        
-        # ============ DECISION LOGIC ============
-        
-        # CASE 1: LONG / COMPRA - Require BOTH groups to strongly agree
-        if summary_signal == 'STRONG_BUY':
-            # Best case: All aligned
-            if candle_confirmed and trend_4h == 'BULLISH' and trend_1h == 'BULLISH':
-                return True, 'LONG', 95, summary.get('reason', 'Ambos grupos confirman FUERTE COMPRA')
-            elif candle_confirmed:
-                return True, 'LONG', 80, summary.get('reason', 'Ambos grupos confirman FUERTE COMPRA')
-            elif trend_4h == 'BULLISH' and trend_1h == 'BULLISH':
-                return True, 'LONG', 75, summary.get('reason', 'Ambos grupos confirman FUERTE COMPRA')
-            else:
-                return True, 'LONG', 65, summary.get('reason', 'Ambos grupos confirman FUERTE COMPRA')
-        
-        # Weaker signal: One group strong, one group moderate
-        elif summary_signal == 'BUY':
-            if candle_confirmed:
-                return True, 'LONG', 60, summary.get('reason', 'Grupos confirman COMPRA')
-            else:
-                return False, 'NEUTRAL', 40, f'Indicadores alcistas pero falta confirmación de velas'
-        
-        # CASE 2: SHORT / VENTA - Require BOTH groups to strongly agree
-        elif summary_signal == 'STRONG_SELL':
-            # Best case: All aligned
-            if candle_confirmed and trend_4h == 'BEARISH' and trend_1h == 'BEARISH':
-                return True, 'SHORT', 95, summary.get('reason', 'Ambos grupos confirman FUERTE VENTA')
-            elif candle_confirmed:
-                return True, 'SHORT', 80, summary.get('reason', 'Ambos grupos confirman FUERTE VENTA')
-            elif trend_4h == 'BEARISH' and trend_1h == 'BEARISH':
-                return True, 'SHORT', 75, summary.get('reason', 'Ambos grupos confirman FUERTE VENTA')
-            else:
-                return True, 'SHORT', 65, summary.get('reason', 'Ambos grupos confirman FUERTE VENTA')
-        
-        # Weaker signal: One group strong, one group moderate
-        elif summary_signal == 'SELL':
-            if candle_confirmed:
-                return True, 'SHORT', 60, summary.get('reason', 'Grupos confirman VENTA')
-            else:
-                return False, 'NEUTRAL', 40, f'Indicadores bajistas pero falta confirmación de velas'
-        
-        # CASE 3: No strong signal from indicators
-        else:
-            return False, 'NEUTRAL', 30, summary.get('reason', 'Grupos no alineados - ESPERAR')
+        trend_4h = tf_4h.trend_side if tf_4h else TrendSide.NONE
+        trend_1h = tf_1h.trend_side if tf_1h else TrendSide.NONE
+        
+        should_trade, direction, confidence, reason, use_summary_reason = _DECISION_TABLE.get(
+            (summary_signal, candle_confirmed, trend_4h, trend_1h), _DECISION_WAIT
+        )
+        if use_summary_reason:
+            reason = summary.get('reason', reason)
+        return should_trade, direction, confidence, reason
     
     def _collect_warnings(self, tf_4h: Optional[TimeframeData], tf_1h: Optional[TimeframeData],
-                          tf_15m: Optional[TimeframeData], candle_15m: dict) -> List[str]:
-        """Collect warnings for the user"""
-        warnings = []
+                          tf_15m: Optional[TimeframeData], candle_15m: dict) -> Sequence[str]:
+        """Collect warnings for the user (shared empty tuple when there are none)"""
+        warnings = None
         
         # Check timeframe misalignment
-        if tf_4h and tf_1h:
-            if tf_4h.candle_trend != tf_1h.candle_trend and tf_4h.candle_trend != 'NONE' and tf_1h.candle_trend != 'NONE':
-                warnings.append("⚠️ 4H y 1H muestran tendencias opuestas")
+        if tf_4h and tf_1h and (tf_4h.candle_trend, tf_1h.candle_trend) in _OPPOSED_SIDES:
+            warnings = ["⚠️ 4H y 1H muestran tendencias opuestas"]
+        
+        # Leer los datos de velas 15m una sola vez
+        candle_trend = _trend_side(candle_15m.get('trend_change', 'NONE'))
+        green = candle_15m.get('consecutive_green', 0)
+        red = candle_15m.get('consecutive_red', 0)
+        consecutive = green if green > red else red
         
         if tf_4h and tf_15m:
-            if tf_4h.candle_trend != candle_15m.get('trend_change', 'NONE'):
-                if 'BULLISH' in candle_15m.get('trend_change', '') and tf_4h.candle_trend == 'BEARISH':
-                    warnings.append("⚠️ 15m alcista pero 4H bajista")
-                elif 'BEARISH' in candle_15m.get('trend_change', '') and tf_4h.candle_trend == 'BULLISH':
-                    warnings.append("⚠️ 15m bajista pero 4H alcista")
+            message = _15M_VS_4H_WARNING.get((candle_trend, tf_4h.candle_trend))
+            if message is not None:
+                if warnings is None:
+                    warnings = []
+                warnings.append(message)
         
         # Check for conflicting candle colors
-        consecutive = max(candle_15m.get('consecutive_green', 0), candle_15m.get('consecutive_red', 0))
-        if consecutive < 3 and consecutive > 0:
+        if 0 < consecutive < 3:
+            if warnings is None:
+                warnings = []
             warnings.append(f"⏳ Esperando confirmación ({consecutive}/3 velas)")
         
-        return warnings
+        return warnings or _EMPTY_WARNINGS
+
+
+# Plantillas estáticas del mensaje de Telegram
+_HEADER_TMPL = (
+    "┏━━━━━━━━━━━━━━━━━━━━┓\n"
+    "┃   {coin:^14}   ┃\n"
+    "┗━━━━━━━━━━━━━━━━━━━━┛\n\n"
+    "💰 Precio: {price}\n\n"
+    "━━━ Análisis Multi-Timeframe ━━━\n\n"
+)
+# Línea de 4H/1H: (etiqueta, icono, texto) y línea sin datos
+_TREND_TF_LINE = "📊 {}: {} {}\n"
+_TREND_TF_MISSING = "📊 {}: ─ (datos no disponibles)\n"
+_TREND_TF_SKIPPED = "📊 {}: ─ (no consultado, sin señal 15m)\n"
+# Línea de 15m por trend_change (cualquier otro valor: sin tendencia)
+_15M_TREND_LINE = {
+    'BULLISH': "📊 15m: ▲ {} velas VERDES\n",
+    'BEARISH': "📊 15m: ▼ {} velas ROJAS\n",
+}
+_15M_NO_TREND_LINE = "📊 15m: ▬ Sin tendencia clara\n"
+_SECTION_SIGNAL = "\n━━━━━━━━━━━━━━━━━━━━\n"
+_SIGNAL_LONG = "┏━ SEÑAL: COMPRA / LONG ▲\n\n"
+_SIGNAL_SHORT = "┏━ SEÑAL: VENTA / SHORT ▼\n\n"
+_LEVELS_TMPL = (
+    "📊 Niveles:\n"
+    "  Entrada → {entry}\n"
+    "  Stop    → {sl}\n"
+    "  Target  → {tp1}\n\n"
+)
+_MA_FOOTER_TMPL = (
+    "━━━ MA7/MA25 (15m) ━━━\n"
+    "MA7:  {ma7}\n"
+    "MA25: {ma25}\n"
+    "\n┗━━━━━━━━━━━━━━━━━━━━"
+)
 
 
 def format_mtf_analysis(mtf: MTFAnalysis, strategy: dict) -> str:
@@ -341,91 +644,71 @@ def format_mtf_analysis(mtf: MTFAnalysis, strategy: dict) -> str:
     # Simple coin name
     coin = mtf.symbol.replace('/USDT:USDT', '').replace('/USDT', '')
     
-    msg = f"┏━━━━━━━━━━━━━━━━━━━━┓\n"
-    msg += f"┃   {coin:^14}   ┃\n"
-    msg += f"┗━━━━━━━━━━━━━━━━━━━━┛\n\n"
-    
-    msg += f"💰 Precio: {format_price(mtf.price)}\n\n"
-    
     # ========== MULTI-TIMEFRAME ANALYSIS ==========
-    msg += "━━━ Análisis Multi-Timeframe ━━━\n\n"
-    
-    # 4H Timeframe
-    if mtf.tf_4h:
-        trend_icon = "▲" if mtf.tf_4h.candle_trend == 'BULLISH' or 'ALCISTA' in mtf.tf_4h.trend else ("▼" if mtf.tf_4h.candle_trend == 'BEARISH' or 'BAJISTA' in mtf.tf_4h.trend else "▬")
-        trend_text = "ALCISTA" if mtf.tf_4h.candle_trend == 'BULLISH' or 'ALCISTA' in mtf.tf_4h.trend else ("BAJISTA" if mtf.tf_4h.candle_trend == 'BEARISH' or 'BAJISTA' in mtf.tf_4h.trend else "LATERAL")
-        msg += f"📊 4H: {trend_icon} {trend_text}\n"
-        if mtf.tf_4h.candle_colors:
-            msg += f"   Velas: {mtf.tf_4h.candle_colors}\n"
-    else:
-        msg += "📊 4H: ─ (datos no disponibles)\n"
-    
-    # 1H Timeframe
-    if mtf.tf_1h:
-        trend_icon = "▲" if mtf.tf_1h.candle_trend == 'BULLISH' or 'ALCISTA' in mtf.tf_1h.trend else ("▼" if mtf.tf_1h.candle_trend == 'BEARISH' or 'BAJISTA' in mtf.tf_1h.trend else "▬")
-        trend_text = "ALCISTA" if mtf.tf_1h.candle_trend == 'BULLISH' or 'ALCISTA' in mtf.tf_1h.trend else ("BAJISTA" if mtf.tf_1h.candle_trend == 'BEARISH' or 'BAJISTA' in mtf.tf_1h.trend else "LATERAL")
-        msg += f"📊 1H: {trend_icon} {trend_text}\n"
-        if mtf.tf_1h.candle_colors:
-            msg += f"   Velas: {mtf.tf_1h.candle_colors}\n"
-    else:
-        msg += "📊 1H: ─ (datos no disponibles)\n"
+    parts = [_HEADER_TMPL.format(coin=coin, price=format_price(mtf.price))]
+    
+    # 4H and 1H Timeframes (each TimeframeData read once)
+    for label, tf_data in (('4H', mtf.tf_4h), ('1H', mtf.tf_1h)):
+        if tf_data:
+            parts.append(_TREND_TF_LINE.format(label, *_SIDE_DISPLAY[_display_side(tf_data)]))
+            candle_colors = tf_data.candle_colors
+            if candle_colors:
+                parts.append(f"   Velas: {candle_colors}\n")
+        elif mtf.trend_tfs_skipped:
+            parts.append(_TREND_TF_SKIPPED.format(label))
+        else:
+            parts.append(_TREND_TF_MISSING.format(label))
     
     # 15m Timeframe (KEY CONFIRMATION)
-    if mtf.tf_15m:
+    tf_15m = mtf.tf_15m
+    if tf_15m:
         candle_data = mtf.candle_confirmation_15m
-        consecutive = max(candle_data.get('consecutive_green', 0), candle_data.get('consecutive_red', 0))
+        green = candle_data.get('consecutive_green', 0)
+        red = candle_data.get('consecutive_red', 0)
+        consecutive = green if green > red else red
         
-        if candle_data.get('trend_change') == 'BULLISH':
-            msg += f"📊 15m: ▲ {consecutive} velas VERDES\n"
-        elif candle_data.get('trend_change') == 'BEARISH':
-            msg += f"📊 15m: ▼ {consecutive} velas ROJAS\n"
-        else:
-            msg += f"📊 15m: ▬ Sin tendencia clara\n"
+        parts.append(_15M_TREND_LINE.get(candle_data.get('trend_change'), _15M_NO_TREND_LINE).format(consecutive))
         
-        if mtf.tf_15m.candle_colors:
-            msg += f"   Velas: {mtf.tf_15m.candle_colors}\n"
+        if tf_15m.candle_colors:
+            parts.append(f"   Velas: {tf_15m.candle_colors}\n")
         
         # Show confirmation status
         if candle_data.get('confirmed', False):
-            msg += f"   ✅ Confirmado (3+ velas)\n"
+            parts.append(f"   ✅ Confirmado (3+ velas)\n")
         elif consecutive > 0:
-            msg += f"   ⏳ Esperando ({consecutive}/3 velas)\n"
-    
-    msg += "\n"
+            parts.append(f"   ⏳ Esperando ({consecutive}/3 velas)\n")
     
     # ========== MAIN SIGNAL ==========
-    msg += "━━━━━━━━━━━━━━━━━━━━\n"
+    parts.append(_SECTION_SIGNAL)
     
     if mtf.should_trade:
         if mtf.trade_direction == "LONG":
-            msg += "┏━ SEÑAL: COMPRA / LONG ▲\n\n"
+            parts.append(_SIGNAL_LONG)
         else:
-            msg += "┏━ SEÑAL: VENTA / SHORT ▼\n\n"
+            parts.append(_SIGNAL_SHORT)
         
-        msg += f"Confianza: {mtf.confidence}%\n"
-        msg += f"Razón: {mtf.reason}\n\n"
+        parts.append(f"Confianza: {mtf.confidence}%\nRazón: {mtf.reason}\n\n")
         
         # Entry/exit levels
-        msg += "📊 Niveles:\n"
-        msg += f"  Entrada → {format_price(strategy['entry'])}\n"
-        msg += f"  Stop    → {format_price(strategy['sl'])}\n"
-        msg += f"  Target  → {format_price(strategy['tp1'])}\n\n"
+        parts.append(_LEVELS_TMPL.format(
+            entry=format_price(strategy['entry']),
+            sl=format_price(strategy['sl']),
+            tp1=format_price(strategy['tp1'])
+        ))
     else:
-        msg += "┏━ SEÑAL: ESPERAR ⏳\n\n"
-        msg += f"{mtf.reason}\n\n"
+        parts.append(f"┏━ SEÑAL: ESPERAR ⏳\n\n{mtf.reason}\n\n")
     
     # Warnings
     if mtf.warnings:
-        msg += "⚠️ Advertencias:\n"
+        parts.append("⚠️ Advertencias:\n")
         for w in mtf.warnings:
-            msg += f"  {w}\n"
-        msg += "\n"
+            parts.append(f"  {w}\n")
+        parts.append("\n")
     
     # MA7/MA25 info (secondary)
-    msg += "━━━ MA7/MA25 (15m) ━━━\n"
-    msg += f"MA7:  {format_price(mtf.ma_crossover['ma7'])}\n"
-    msg += f"MA25: {format_price(mtf.ma_crossover['ma25'])}\n"
-    
-    msg += f"\n┗━━━━━━━━━━━━━━━━━━━━"
+    parts.append(_MA_FOOTER_TMPL.format(
+        ma7=format_price(mtf.ma_crossover['ma7']),
+        ma25=format_price(mtf.ma_crossover['ma25'])
+    ))
     
-    return msg
+    return ''.join(parts)
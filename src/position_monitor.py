@@ -1,18 +1,30 @@
 """
 Monitoreo continuo de posiciones activas
-Verifica precio cada 60 segundos y envía alertas
+Verifica precio cada 15-60 segundos (más seguido cerca de SL/TP) y envía alertas
 """
 
 import asyncio
+import math
 from datetime import datetime
 from typing import Optional
 import ccxt
-from telegram import Bot
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
 
 from src.position_tracker import PositionTracker
 from src.ma_strategy import MAStrategy
 from src.config import Config
 
+# Intervalo entre revisiones (segundos): proporcional a la distancia al SL/TP
+# más cercano, acotado a [15, 60] s (<=2.5% -> 15 s, 5% -> 30 s, >=10% -> 60 s).
+# El mínimo es el TTL de la caché de velas 15m de MAStrategy: revisar más
+# seguido repetiría los mismos datos
+_POLL_MIN = 15
+_POLL_MAX = 60
+_POLL_PER_DISTANCE = 600
+
+# Ancho de los tramos de P&L que disparan una actualización (%)
+_PNL_BUCKET = 3.0
+
 
 class PositionMonitor:
     """Monitorea posiciones activas y envía alertas"""
@@ -23,32 +35,50 @@ class PositionMonitor:
         self.strategy = MAStrategy()
         self.bot = Bot(token=Config.TELEGRAM_BOT_TOKEN)
         self.is_running = False
-        self.last_pnl_percent = 0  # Para detectar cambios significativos
+        self._stop_event = asyncio.Event()  # despierta la espera al detener
+        self.last_pnl_bucket = 0  # Tramo de 3% del último aviso de P&L
+        self.last_alerted_pnl = 0.0  # P&L (%) del último aviso
+        self._last_cross_alert = None  # (id posición, vela 15m) del último aviso de cruce
     
     async def start_monitoring(self):
         """Inicia el monitoreo continuo"""
         self.is_running = True
+        self._stop_event.clear()
         print(f"▸ Monitoreo iniciado para chat_id: {self.chat_id}")
         
         while self.is_running:
             try:
-                await self._check_active_position()
-                await asyncio.sleep(60)  # Esperar 60 segundos
+                interval = await self._check_active_position()
             except Exception as e:
                 print(f"Error en monitoreo: {str(e)}")
-                await asyncio.sleep(60)
+                interval = _POLL_MAX
+            
+            # Esperar el intervalo o hasta que stop_monitoring lo interrumpa
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=interval)
+                break
+            except asyncio.TimeoutError:
+                pass
     
     async def stop_monitoring(self):
         """Detiene el monitoreo"""
         self.is_running = False
+        self._stop_event.set()
+        # El exchange asíncrono es compartido con otras corrutinas: se cierra
+        # al apagar la aplicación, no al detener un monitor
         print(f"▸ Monitoreo detenido para chat_id: {self.chat_id}")
     
-    async def _check_active_position(self):
-        """Verifica posición activa y envía alertas si es necesario"""
+    async def _check_active_position(self) -> float:
+        """
+        Verifica posición activa y envía alertas si es necesario
+        
+        Returns:
+            Segundos hasta la siguiente revisión
+        """
         position = self.tracker.get_active_position()
         
         if not position:
-            return  # No hay posición activa
+            return _POLL_MAX  # No hay posición activa
         
         try:
             symbol = position['symbol']
@@ -57,9 +87,11 @@ class PositionMonitor:
             sl_price = position['sl_price']
             tp_price = position['tp_price']
             
-            # Obtener precio actual
-            ticker = self.strategy.exchange.fetch_ticker(symbol)
-            current_price = ticker['last']
+            # Una sola descarga de velas 15m por ciclo: el cierre de la vela
+            # abierta es el último precio y las mismas velas sirven para el cruce.
+            # Con el exchange asíncrono compartido no se bloquea el event loop
+            df = await self.strategy._fetch_ohlcv_df_async(symbol, '15m', limit=50)
+            current_price = float(df['close'].iloc[-1])
             
             # Calcular P&L
             pnl_data = self.tracker.calculate_pnl(position, current_price)
@@ -68,37 +100,47 @@ class PositionMonitor:
             # ========== VERIFICAR ALERTAS ==========
             
             # 1. TP alcanzado
+            # (tras una alerta de TP/SL se espera el máximo para no repetirla seguido)
             if direction == 'LONG' and current_price >= tp_price:
                 await self._send_tp_alert(position, current_price, pnl_data)
-                return
+                return _POLL_MAX
             elif direction == 'SHORT' and current_price <= tp_price:
                 await self._send_tp_alert(position, current_price, pnl_data)
-                return
+                return _POLL_MAX
             
             # 2. SL alcanzado
             if direction == 'LONG' and current_price <= sl_price:
                 await self._send_sl_alert(position, current_price, pnl_data)
-                return
+                return _POLL_MAX
             elif direction == 'SHORT' and current_price >= sl_price:
                 await self._send_sl_alert(position, current_price, pnl_data)
-                return
+                return _POLL_MAX
             
             # 3. Cruce de MAs en contra
-            await self._check_reverse_cross(position, current_price, pnl_data)
+            await self._check_reverse_cross(position, current_price, pnl_data, df)
             
-            # 4. Actualización de P&L cada +/-3% o +/-5%
-            pnl_change = abs(pnl_percent - self.last_pnl_percent)
-            if pnl_change >= 3.0:  # Cambio significativo
+            # 4. Actualización de P&L al cambiar de tramo de 3% ([0,3), [-3,0)...).
+            # Histéresis: solo avisa si saltó más de un tramo o si el P&L se movió
+            # un tramo completo desde el último aviso; oscilar en un borde no repite
+            pnl_bucket = math.floor(pnl_percent / _PNL_BUCKET)
+            if pnl_bucket != self.last_pnl_bucket and (
+                abs(pnl_bucket - self.last_pnl_bucket) > 1
+                or abs(pnl_percent - self.last_alerted_pnl) >= _PNL_BUCKET
+            ):
                 await self._send_pnl_update(position, current_price, pnl_data)
-                self.last_pnl_percent = pnl_percent
+                self.last_pnl_bucket = pnl_bucket
+                self.last_alerted_pnl = pnl_percent
+            
+            # Siguiente revisión según la distancia al nivel más cercano
+            distance = min(abs(current_price - sl_price), abs(tp_price - current_price)) / current_price
+            return max(_POLL_MIN, min(_POLL_MAX, distance * _POLL_PER_DISTANCE))
         
         except Exception as e:
             print(f"Error verificando posición: {str(e)}")
+            return _POLL_MAX
     
     async def _send_tp_alert(self, position: dict, current_price: float, pnl_data: dict):
         """Envía alerta de TP alcanzado"""
-        from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-        
         message = f"""
 🎉 TP ALCANZADO - {position['symbol']}
 
@@ -124,8 +166,6 @@ Objetivo cumplido! 🎯
     
     async def _send_sl_alert(self, position: dict, current_price: float, pnl_data: dict):
         """Envía alerta de SL alcanzado"""
-        from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-        
         message = f"""
 ⛔ STOP LOSS ALCANZADO - {position['symbol']}
 
@@ -149,25 +189,27 @@ Cortar pérdidas rápido! ✂️
             reply_markup=reply_markup
         )
     
-    async def _check_reverse_cross(self, position: dict, current_price: float, pnl_data: dict):
-        """Verifica si hubo cruce de MAs en contra"""
+    async def _check_reverse_cross(self, position: dict, current_price: float, pnl_data: dict, df):
+        """Verifica si hubo cruce de MAs en contra (df: velas 15m ya descargadas)"""
         try:
-            symbol = position['symbol']
             direction = position['direction']
             
-            # Obtener velas recientes de 15M
-            ohlcv = self.strategy.exchange.fetch_ohlcv(symbol, '15m', limit=50)
-            import pandas as pd
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            
             # Detectar cruce
             ma_cross = self.strategy.calculate_ma_cross(df)
             
+            # Un solo aviso por vela: con revisiones más frecuentes el mismo
+            # cruce se detectaría varias veces
+            alert_key = (position['id'], df['timestamp'].iloc[-1])
+            if alert_key == self._last_cross_alert:
+                return
+            
             # Si hay cruce en contra, alertar
             if direction == 'LONG' and ma_cross.get('cross') == 'bearish':
                 await self._send_reverse_cross_alert(position, current_price, pnl_data, 'bearish')
+                self._last_cross_alert = alert_key
             elif direction == 'SHORT' and ma_cross.get('cross') == 'bullish':
                 await self._send_reverse_cross_alert(position, current_price, pnl_data, 'bullish')
+                self._last_cross_alert = alert_key
         
         except Exception as e:
             print(f"Error verificando cruce: {str(e)}")
@@ -175,8 +217,6 @@ Cortar pérdidas rápido! ✂️
     async def _send_reverse_cross_alert(self, position: dict, current_price: float, 
                                        pnl_data: dict, cross_type: str):
         """Envía alerta de cruce contrario"""
-        from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-        
         cross_text = "ABAJO" if cross_type == 'bearish' else "ARRIBA"
         
         message = f"""
@@ -4,6 +4,7 @@ Maneja 1 posición activa a la vez
 """
 
 import sqlite3
+import threading
 from datetime import datetime
 from typing import Optional, Dict
 import os
@@ -14,12 +15,18 @@ class PositionTracker:
     
     def __init__(self, db_path: str = "positions.db"):
         self.db_path = db_path
+        self._lock = threading.RLock()  # una sola conexión compartida entre hilos
         self._init_database()
     
     def _init_database(self):
-        """Crea la tabla de posiciones si no existe"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Abre la conexión persistente y crea la tabla de posiciones si no existe"""
+        # Autocommit (isolation_level=None): cada sentencia se confirma sola
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        cursor = self._conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
         
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS positions (
@@ -39,8 +46,17 @@ class PositionTracker:
             )
         """)
         
-        conn.commit()
-        conn.close()
+        # Índice parcial: get_active_position se resuelve sin recorrer el historial
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_active_pos
+            ON positions(opened_at DESC) WHERE status = 'ACTIVE'
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_opened_at ON positions(opened_at DESC)")
+    
+    def close(self):
+        """Cierra la conexión a la base de datos"""
+        with self._lock:
+            self._conn.close()
     
     def open_position(self, symbol: str, direction: str, entry_price: float,
                      sl_price: float, tp_price: float, ma7: float = None,
@@ -61,46 +77,39 @@ class PositionTracker:
         Returns:
             int: ID de la posición creada
         """
-        # Verificar que no haya otra posición activa
-        active = self.get_active_position()
-        if active:
-            raise Exception(f"Ya existe una posición activa: {active['symbol']}")
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO positions 
-            (symbol, direction, entry_price, sl_price, tp_price, ma7, ma25, confidence, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'ACTIVE')
-        """, (symbol, direction, entry_price, sl_price, tp_price, ma7, ma25, confidence))
-        
-        position_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return position_id
+        with self._lock:
+            # Verificar que no haya otra posición activa
+            active = self.get_active_position()
+            if active:
+                raise Exception(f"Ya existe una posición activa: {active['symbol']}")
+            
+            cursor = self._conn.cursor()
+            cursor.execute("""
+                INSERT INTO positions 
+                (symbol, direction, entry_price, sl_price, tp_price, ma7, ma25, confidence, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'ACTIVE')
+            """, (symbol, direction, entry_price, sl_price, tp_price, ma7, ma25, confidence))
+            
+            return cursor.lastrowid
     
     def get_active_position(self) -> Optional[Dict]:
         """
         Obtiene la posición activa actual
         
         Returns:
-            dict o None: Datos de la posición activa
+            dict o None: id, symbol, direction, entry_price, sl_price y tp_price
+            de la posición activa (lo que usa el monitor; el resto con get_position_by_id)
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM positions 
-            WHERE status = 'ACTIVE' 
-            ORDER BY opened_at DESC 
-            LIMIT 1
-        """)
-        
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("""
+                SELECT id, symbol, direction, entry_price, sl_price, tp_price
+                FROM positions 
+                WHERE status = 'ACTIVE' 
+                ORDER BY opened_at DESC 
+                LIMIT 1
+            """)
+            row = cursor.fetchone()
         
         if row:
             return dict(row)
@@ -117,30 +126,23 @@ class PositionTracker:
         Returns:
             bool: True si se cerró correctamente
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            UPDATE positions 
-            SET status = ?
-            WHERE id = ?
-        """, (f'CLOSED_{reason}', position_id))
-        
-        rows_affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("""
+                UPDATE positions 
+                SET status = ?
+                WHERE id = ?
+            """, (f'CLOSED_{reason}', position_id))
+            rows_affected = cursor.rowcount
         
         return rows_affected > 0
     
     def get_position_by_id(self, position_id: int) -> Optional[Dict]:
         """Obtiene una posición por ID"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM positions WHERE id = ?", (position_id,))
-        row = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("SELECT * FROM positions WHERE id = ?", (position_id,))
+            row = cursor.fetchone()
         
         if row:
             return dict(row)
@@ -148,20 +150,18 @@ class PositionTracker:
     
     def get_all_positions(self, limit: int = 50) -> list:
         """Obtiene todas las posiciones (historial)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT * FROM positions 
-            ORDER BY opened_at DESC 
-            LIMIT ?
-        """, (limit,))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None  # tuplas: sin un objeto Row por fila
+            cursor.execute("""
+                SELECT * FROM positions 
+                ORDER BY opened_at DESC 
+                LIMIT ?
+            """, (limit,))
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+        
+        return [dict(zip(columns, row)) for row in rows]
     
     def calculate_pnl(self, position: Dict, current_price: float) -> Dict:
         """
@@ -173,18 +173,14 @@ class PositionTracker:
         
         Returns:
             dict: {
-                'pnl_percent': float,
-                'pnl_usd': float (estimado con 10% de capital),
+                'pnl_percent': float (sin redondear; se redondea al formatear),
+                'pnl_usd': float (estimado con 10% de capital, sin redondear),
                 'status': 'profit' / 'loss' / 'breakeven'
             }
         """
         entry = position['entry_price']
-        direction = position['direction']
-        
-        if direction == 'LONG':
-            pnl_percent = ((current_price - entry) / entry) * 100
-        else:  # SHORT
-            pnl_percent = ((entry - current_price) / entry) * 100
+        sign = 1.0 if position['direction'] == 'LONG' else -1.0  # SHORT gana si baja
+        pnl_percent = sign * (current_price - entry) / entry * 100
         
         # Estimación simple (asumiendo $1000 capital total, 10% = $100, 10x leverage = $1000 posición)
         # P&L = posición_size * (pnl_percent / 100)
@@ -197,7 +193,7 @@ class PositionTracker:
             status = 'loss'
         
         return {
-            'pnl_percent': round(pnl_percent, 2),
-            'pnl_usd': round(pnl_usd, 2),
+            'pnl_percent': pnl_percent,
+            'pnl_usd': pnl_usd,
             'status': status
         }
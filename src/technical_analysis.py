@@ -2,11 +2,24 @@
 Technical Analysis Module
 Advanced technical indicators and signal generation with multi-factor confirmation
 """
+import copy
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import ta
 import numpy as np
+from numba import njit
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import Dict, Tuple, List
 from enum import Enum
+from src._indicator_kernels import _sma, _ema, _macd, _rsi, _atr, _adx, _stoch
+
+logger = logging.getLogger(__name__)
+
+# Errors of one symbol/timeframe analysis: BinanceClient wraps ccxt errors in
+# ValueError; the rest come from indicator calculation on incomplete data
+_TIMEFRAME_ERRORS = (ValueError, KeyError, IndexError, TypeError)
 
 
 class SignalType(Enum):
@@ -18,6 +31,175 @@ class SignalType(Enum):
     STRONG_SELL = "VENTA FUERTE"
 
 
+# Descripción de cada resultado de detect_ma_crossover
+_MA_CROSS_DESCRIPTIONS = {
+    'LONG': '🟢 MA7 cruzó ARRIBA de MA25 → LONG',
+    'SHORT': '🔴 MA7 cruzó ABAJO de MA25 → SHORT',
+    'LONG_TREND': 'MA7 está ARRIBA de MA25 (tendencia alcista)',
+    'SHORT_TREND': 'MA7 está ABAJO de MA25 (tendencia bajista)',
+}
+
+# analyze_symbol memoiza por (símbolo, timeframe, última vela): mientras la vela
+# en curso no cambie, el análisis es idéntico
+_ANALYSIS_CACHE_MAXSIZE = 512
+_analysis_cache: OrderedDict = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# Hilos de analyze_symbols: los kernels de numba liberan el GIL
+_BATCH_MAX_WORKERS = 8
+
+# Columnas de entrada que TechnicalAnalyzer lee como arrays float64
+_OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Emoji por código de color de vela: 1 verde, -1 roja, 0 neutral
+_CANDLE_EMOJI = {1: '🟢', -1: '🔴', 0: '⚪'}
+
+# Patrones de velas por bit de _candle_pattern_mask: (nombre, puntaje)
+_CANDLE_PATTERNS = (
+    ("Doji", 0),
+    ("🔥 Hammer (reversal alcista)", 15),
+    ("Hanging Man", -10),
+    ("⚠️ Shooting Star (reversal bajista)", -15),
+    ("🔥 Bullish Engulfing", 20),
+    ("⚠️ Bearish Engulfing", -20),
+    ("🔥 Morning Star", 25),
+    ("⚠️ Evening Star", -25),
+)
+
+# Campos de 'indicators' en generate_analysis: (columna, decimales, None si NaN)
+_INDICATOR_FIELDS = (
+    ('rsi', 2, True),
+    ('macd', 4, True),
+    ('macd_signal', 4, True),
+    ('ema_9', 2, False),
+    ('ema_21', 2, False),
+    ('ema_50', 2, False),
+    ('ema_200', 2, False),
+    ('bb_upper', 2, True),
+    ('bb_lower', 2, True),
+    ('volume_ratio', 2, False),
+    ('adx', 2, False),
+)
+
+
+def _tally_votes(votes: Dict[str, dict]) -> Tuple[int, int, int]:
+    """(long, short, neutral) counts of a votes dict; each vote is 1, -1 or 0"""
+    codes = [v['vote'] for v in votes.values()]
+    long_count = codes.count(1)
+    short_count = codes.count(-1)
+    return long_count, short_count, len(codes) - long_count - short_count
+
+
+def _nan_mean(values: np.ndarray) -> float:
+    """Mean skipping NaN like Series.mean(); NaN when no value is left"""
+    valid = ~np.isnan(values)
+    count = valid.sum()
+    if count == 0:
+        return np.nan
+    return np.where(valid, values, 0.0).sum() / count
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """Values `periods` bars back, NaN-padded (Series.shift on a float array)"""
+    shifted = np.full_like(values, np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Population std over each trailing window (strided view), NaN until full"""
+    out = np.full_like(values, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=-1)
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _candle_pattern_mask(open_, high, low, close):
+    """
+    Candlestick patterns on the last 3 candles as a bitmask.
+    
+    Returns:
+        int with bit i set when _CANDLE_PATTERNS[i] is present
+    """
+    o, h, l, c = open_[-1], high[-1], low[-1], close[-1]
+    o1, c1 = open_[-2], close[-2]
+    o2, c2 = open_[-3], close[-3]
+    
+    body = abs(c - o)
+    upper_shadow = h - max(c, o)
+    lower_shadow = min(c, o) - l
+    prev_body = abs(c1 - o1)
+    
+    mask = 0
+    # Doji (indecision)
+    if body < (h - l) * 0.1:
+        mask |= 1
+    # Hammer after a bearish candle, Hanging Man otherwise
+    if lower_shadow > body * 2 and upper_shadow < body * 0.3:
+        mask |= 2 if c1 < o1 else 4
+    # Shooting Star after a bullish candle
+    if upper_shadow > body * 2 and lower_shadow < body * 0.3 and c1 > o1:
+        mask |= 8
+    # Engulfing
+    if c1 < o1 and c > o and o < c1 and c > o1:
+        mask |= 16
+    if c1 > o1 and c < o and o > c1 and c < o1:
+        mask |= 32
+    # Morning / Evening Star (3 candles, small middle body)
+    small_middle = abs(c1 - o1) < prev_body * 0.3
+    if c2 < o2 and small_middle and c > o and c > (o2 + c2) / 2:
+        mask |= 64
+    if c2 > o2 and small_middle and c < o and c < (o2 + c2) / 2:
+        mask |= 128
+    return mask
+
+
+@njit(cache=True, nogil=True)
+def _candle_color_loop(open_, close, lookback):
+    """
+    Count the latest green/red streak over the last `lookback` candles.
+    
+    Returns:
+        (consecutive_green, consecutive_red, trend, had_opposite_before)
+        where trend is 1 (3+ green), -1 (3+ red) or 0
+    """
+    n = close.shape[0]
+    start = n - lookback
+    
+    consecutive_green = 0
+    i = n - 1
+    while i >= start and close[i] > open_[i]:
+        consecutive_green += 1
+        i -= 1
+    
+    # Red streak only counts when the latest candle is not green
+    consecutive_red = 0
+    if consecutive_green == 0:
+        i = n - 1
+        while i >= start and close[i] < open_[i]:
+            consecutive_red += 1
+            i -= 1
+    
+    trend = 0
+    had_opposite_before = False
+    if consecutive_green >= 3:
+        trend = 1
+        for j in range(start, n - consecutive_green):
+            if close[j] < open_[j]:
+                had_opposite_before = True
+                break
+    elif consecutive_red >= 3:
+        trend = -1
+        for j in range(start, n - consecutive_red):
+            if close[j] > open_[j]:
+                had_opposite_before = True
+                break
+    
+    return consecutive_green, consecutive_red, trend, had_opposite_before
+
+
 class TechnicalAnalyzer:
     """
     Advanced technical analysis with multiple indicators and confirmation system
@@ -31,98 +213,154 @@ class TechnicalAnalyzer:
         Args:
             df: DataFrame with columns: open, high, low, close, volume
         """
-        self.df = df.copy()
+        # No copy: indicators are attached by concat into a new frame, so the
+        # caller's DataFrame is never written to
+        self.df = df
         self.indicators = {}
         self.score = 0
         self.signal = SignalType.NEUTRAL
+        self._indicators_ready = False
+        self._tail = None
+        self._arrays = None
+        self._last_nan = frozenset()
+        self.cols = None
         
     def calculate_all_indicators(self):
-        """Calculate all technical indicators"""
+        """Calculate all technical indicators (once per analyzer)"""
+        if self._indicators_ready:
+            return
+        # Inputs as float64 arrays; each _calculate_* adds its columns to self.cols
+        self.cols = {col: self.df[col].to_numpy(dtype=np.float64) for col in _OHLCV_COLUMNS}
         self._calculate_trend_indicators()
         self._calculate_momentum_indicators()
         self._calculate_volatility_indicators()
         self._calculate_volume_indicators()
         
+        # One concat instead of a DataFrame insert (and block copy) per indicator
+        indicators = {col: values for col, values in self.cols.items() if col not in _OHLCV_COLUMNS}
+        self.df = pd.concat(
+            [self.df.drop(columns=list(indicators), errors='ignore'),
+             pd.DataFrame(indicators, index=self.df.index)],
+            axis=1,
+        )
+        self._indicators_ready = True
+        self._tail = None
+    
+    def _last_rows(self) -> Tuple[dict, dict]:
+        """
+        Last and previous rows as {column: value} dicts, extracted once and
+        shared by all detectors (plain dict lookups instead of Series indexing)
+        """
+        if self._tail is None:
+            self._arrays = {col: self.df[col].to_numpy() for col in self.df.columns}
+            last = {col: values[-1] for col, values in self._arrays.items()}
+            if len(self.df) > 1:
+                prev = {col: values[-2] for col, values in self._arrays.items()}
+            else:
+                prev = last
+            # Columns whose last value is NaN (x != x), for the detectors' guards
+            self._last_nan = frozenset(col for col, value in last.items() if value != value)
+            self._tail = (last, prev)
+        return self._tail
+    
+    def _recent_trend(self, column: str, bars: int = 5) -> float:
+        """
+        Mean bar-to-bar change of `column` over the last `bars` rows
+        
+        The diffs telescope, so with no missing values this is
+        (last - first) / (bars - 1); otherwise the NaN-skipping mean of the
+        diffs, like Series.diff().mean().
+        """
+        self._last_rows()
+        values = self._arrays[column][-bars:]
+        if len(values) < 2:
+            return np.nan
+        if not np.isnan(values).any():
+            return (values[-1] - values[0]) / (len(values) - 1)
+        return _nan_mean(np.diff(values))
+        
     def _calculate_trend_indicators(self):
         """Calculate trend-following indicators (MAs, EMAs, MACD)"""
-        close = self.df['close']
+        cols = self.cols
+        close = cols['close']
         
         # Simple Moving Averages (MA7, MA25, MA99 - TradingView style)
-        self.df['ma_7'] = ta.trend.SMAIndicator(close, window=7).sma_indicator()
-        self.df['ma_25'] = ta.trend.SMAIndicator(close, window=25).sma_indicator()
-        self.df['ma_99'] = ta.trend.SMAIndicator(close, window=99).sma_indicator()
+        # MAs, EMAs, MACD and RSI run as numba kernels (same values as `ta`)
+        cols['ma_7'] = _sma(close, 7)
+        cols['ma_25'] = _sma(close, 25)
+        cols['ma_99'] = _sma(close, 99)
         
         # Exponential Moving Averages
-        self.df['ema_9'] = ta.trend.EMAIndicator(close, window=9).ema_indicator()
-        self.df['ema_21'] = ta.trend.EMAIndicator(close, window=21).ema_indicator()
-        self.df['ema_50'] = ta.trend.EMAIndicator(close, window=50).ema_indicator()
-        self.df['ema_200'] = ta.trend.EMAIndicator(close, window=200).ema_indicator()
+        cols['ema_9'] = _ema(close, 9)
+        cols['ema_21'] = _ema(close, 21)
+        cols['ema_50'] = _ema(close, 50)
+        cols['ema_200'] = _ema(close, 200)
         
         # MACD (Moving Average Convergence Divergence)
-        macd = ta.trend.MACD(close, window_fast=12, window_slow=26, window_sign=9)
-        self.df['macd'] = macd.macd()
-        self.df['macd_signal'] = macd.macd_signal()
-        self.df['macd_hist'] = macd.macd_diff()
-        
-        # ADX (Average Directional Index)
-        try:
-            high = self.df['high']
-            low = self.df['low']
-            adx = ta.trend.ADXIndicator(high, low, close, window=14)
-            self.df['adx'] = adx.adx()
-            self.df['adx_plus'] = adx.adx_pos()
-            self.df['adx_minus'] = adx.adx_neg()
-        except:
-            self.df['adx'] = 0
-            self.df['adx_plus'] = 0
-            self.df['adx_minus'] = 0
+        cols['macd'], cols['macd_signal'], cols['macd_hist'] = _macd(close, 12, 26, 9)
+        
+        # ADX (Average Directional Index), also a kernel: ta runs it as Python loops.
+        # It needs two full windows; shorter frames keep the 0 fallback
+        if len(close) >= 2 * 14:
+            cols['adx'], cols['adx_plus'], cols['adx_minus'] = _adx(
+                cols['high'], cols['low'], close, 14
+            )
+        else:
+            cols['adx'] = 0
+            cols['adx_plus'] = 0
+            cols['adx_minus'] = 0
         
         # Rate of Change (Momentum)
-        self.df['roc'] = ta.momentum.ROCIndicator(close, window=10).roc()
+        close_prev = _shift(close, 10)
+        cols['roc'] = ((close - close_prev) / close_prev) * 100
         
     def _calculate_momentum_indicators(self):
         """Calculate momentum indicators (RSI, Stochastic)"""
-        close = self.df['close']
-        high = self.df['high']
-        low = self.df['low']
+        cols = self.cols
         
         # RSI (Relative Strength Index)
-        self.df['rsi'] = ta.momentum.RSIIndicator(close, window=14).rsi()
+        cols['rsi'] = _rsi(cols['close'], 14)
         
-        # Stochastic Oscillator
-        stoch = ta.momentum.StochasticOscillator(high, low, close, window=14, smooth_window=3)
-        self.df['stoch_k'] = stoch.stoch()
-        self.df['stoch_d'] = stoch.stoch_signal()
+        # Stochastic Oscillator: 14-bar low/high range, %D as 3-bar SMA of %K
+        cols['stoch_k'], cols['stoch_d'] = _stoch(cols['high'], cols['low'], cols['close'], 14, 3)
         
     def _calculate_volatility_indicators(self):
         """Calculate volatility indicators (Bollinger Bands, ATR)"""
-        close = self.df['close']
-        high = self.df['high']
-        low = self.df['low']
-        
-        # Bollinger Bands
-        bbands = ta.volatility.BollingerBands(close, window=20, window_dev=2)
-        self.df['bb_upper'] = bbands.bollinger_hband()
-        self.df['bb_middle'] = bbands.bollinger_mavg()
-        self.df['bb_lower'] = bbands.bollinger_lband()
-        self.df['bb_width'] = (self.df['bb_upper'] - self.df['bb_lower']) / self.df['bb_middle']
-        
-        # ATR (Average True Range)
-        self.df['atr'] = ta.volatility.AverageTrueRange(high, low, close, window=14).average_true_range()
+        cols = self.cols
+        close = cols['close']
+        high = cols['high']
+        low = cols['low']
+        
+        # Bollinger Bands (20-bar SMA +/- 2 population std)
+        bb_middle = _sma(close, 20)
+        bb_std = _rolling_std(close, 20)
+        cols['bb_upper'] = bb_middle + 2 * bb_std
+        cols['bb_middle'] = bb_middle
+        cols['bb_lower'] = bb_middle - 2 * bb_std
+        cols['bb_width'] = (cols['bb_upper'] - cols['bb_lower']) / bb_middle
+        
+        # ATR (Average True Range): true range vectorized, Wilder smoothing as a kernel
+        prev_close = _shift(close, 1)
+        # fmax skips the NaN previous close on the first bar, like ta's max(axis=1)
+        true_range = np.fmax.reduce([
+            high - low,
+            np.abs(high - prev_close),
+            np.abs(low - prev_close),
+        ])
+        cols['atr'] = _atr(true_range, 14, true_range[:14].mean())
         
     def _calculate_volume_indicators(self):
-        """Calculate volume-based indicators (OBV, Volume MA)"""
-        close = self.df['close']
-        volume = self.df['volume']
+        """Calculate volume-based indicators (OBV, volume ratio)"""
+        cols = self.cols
+        close = cols['close']
+        volume = cols['volume']
         
-        # On Balance Volume
-        self.df['obv'] = ta.volume.OnBalanceVolumeIndicator(close, volume).on_balance_volume()
+        # On Balance Volume: +volume unless the close fell vs the previous bar
+        cols['obv'] = np.where(close < _shift(close, 1), -volume, volume).cumsum()
         
-        # Volume Moving Average (simple rolling mean)
-        self.df['volume_ma'] = volume.rolling(window=20).mean()
-        
-        # Volume ratio (current vs average)
-        self.df['volume_ratio'] = volume / self.df['volume_ma']
+        # Volume ratio vs its 20-bar SMA (the average itself is not kept as a column)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cols['volume_ratio'] = volume / _sma(volume, 20)
     
     def detect_ma_crossover(self) -> dict:
         """
@@ -138,47 +376,30 @@ class TechnicalAnalyzer:
         if len(self.df) < 3:
             return {'signal': 'NONE', 'description': 'Datos insuficientes', 'ma7': 0, 'ma25': 0}
         
-        last = self.df.iloc[-1]
-        prev = self.df.iloc[-2]
+        last, prev = self._last_rows()
         
         ma7_now = last['ma_7']
         ma25_now = last['ma_25']
         ma7_prev = prev['ma_7']
         ma25_prev = prev['ma_25']
         
-        # LONG: MA7 cruza hacia ARRIBA de MA25 (estaba abajo, ahora arriba)
-        if ma7_prev <= ma25_prev and ma7_now > ma25_now:
-            return {
-                'signal': 'LONG',
-                'description': '🟢 MA7 cruzó ARRIBA de MA25 → LONG',
-                'ma7': ma7_now,
-                'ma25': ma25_now
-            }
-        
-        # SHORT: MA7 cruza hacia ABAJO de MA25 (estaba arriba, ahora abajo)
-        if ma7_prev >= ma25_prev and ma7_now < ma25_now:
-            return {
-                'signal': 'SHORT',
-                'description': '🔴 MA7 cruzó ABAJO de MA25 → SHORT',
-                'ma7': ma7_now,
-                'ma25': ma25_now
-            }
-        
-        # No crossover, but determine current position
-        if ma7_now > ma25_now:
-            return {
-                'signal': 'LONG_TREND',
-                'description': 'MA7 está ARRIBA de MA25 (tendencia alcista)',
-                'ma7': ma7_now,
-                'ma25': ma25_now
-            }
+        above = ma7_now > ma25_now
+        if above and ma7_prev <= ma25_prev:
+            # MA7 cruza hacia ARRIBA de MA25 (estaba abajo, ahora arriba)
+            signal = 'LONG'
+        elif ma7_now < ma25_now and ma7_prev >= ma25_prev:
+            # MA7 cruza hacia ABAJO de MA25 (estaba arriba, ahora abajo)
+            signal = 'SHORT'
         else:
-            return {
-                'signal': 'SHORT_TREND',
-                'description': 'MA7 está ABAJO de MA25 (tendencia bajista)',
-                'ma7': ma7_now,
-                'ma25': ma25_now
-            }
+            # Sin cruce: posición actual de MA7 respecto a MA25
+            signal = 'LONG_TREND' if above else 'SHORT_TREND'
+        
+        return {
+            'signal': signal,
+            'description': _MA_CROSS_DESCRIPTIONS[signal],
+            'ma7': ma7_now,
+            'ma25': ma25_now
+        }
     
     def get_tradingview_votes(self) -> dict:
         """
@@ -188,8 +409,7 @@ class TechnicalAnalyzer:
         Returns:
             Dictionary with votes and summary
         """
-        last = self.df.iloc[-1]
-        prev = self.df.iloc[-2] if len(self.df) > 1 else last
+        last, prev = self._last_rows()
         
         votes = {}
         
@@ -210,7 +430,7 @@ class TechnicalAnalyzer:
             votes['MA25'] = {'vote': 0, 'reason': 'Precio en MA25'}
         
         # 3. MA99 - Price above/below MA99
-        if not pd.isna(last['ma_99']):
+        if 'ma_99' not in self._last_nan:
             if last['close'] > last['ma_99']:
                 votes['MA99'] = {'vote': 1, 'reason': 'Precio arriba de MA99'}
             elif last['close'] < last['ma_99']:
@@ -222,7 +442,7 @@ class TechnicalAnalyzer:
         
         # 4. RSI
         rsi = last['rsi']
-        if not pd.isna(rsi):
+        if 'rsi' not in self._last_nan:
             if rsi < 30:
                 votes['RSI'] = {'vote': 1, 'reason': f'RSI sobreventa ({rsi:.0f})'}
             elif rsi > 70:
@@ -235,7 +455,7 @@ class TechnicalAnalyzer:
             votes['RSI'] = {'vote': 0, 'reason': 'RSI no disponible'}
         
         # 5. MACD
-        if not pd.isna(last['macd']) and not pd.isna(last['macd_signal']):
+        if 'macd' not in self._last_nan and 'macd_signal' not in self._last_nan:
             macd_diff = last['macd'] - last['macd_signal']
             if macd_diff > 0:
                 votes['MACD'] = {'vote': 1, 'reason': 'MACD alcista'}
@@ -247,7 +467,7 @@ class TechnicalAnalyzer:
         # 6. Stochastic
         stoch_k = last.get('stoch_k')
         stoch_d = last.get('stoch_d')
-        if not pd.isna(stoch_k) and not pd.isna(stoch_d):
+        if 'stoch_k' not in self._last_nan and 'stoch_d' not in self._last_nan:
             if stoch_k < 20:
                 votes['STOCH'] = {'vote': 1, 'reason': f'Stoch sobreventa ({stoch_k:.0f})'}
             elif stoch_k > 80:
@@ -275,7 +495,7 @@ class TechnicalAnalyzer:
         bb_upper = last.get('bb_upper')
         bb_lower = last.get('bb_lower')
         bb_middle = last.get('bb_middle')
-        if not pd.isna(bb_upper) and not pd.isna(bb_lower):
+        if 'bb_upper' not in self._last_nan and 'bb_lower' not in self._last_nan:
             if last['close'] <= bb_lower:
                 votes['BB'] = {'vote': 1, 'reason': 'En banda inferior'}
             elif last['close'] >= bb_upper:
@@ -288,7 +508,7 @@ class TechnicalAnalyzer:
             votes['BB'] = {'vote': 0, 'reason': 'BB no disponible'}
         
         # 9. OBV (On Balance Volume)
-        obv_trend = self.df['obv'].iloc[-5:].diff().mean() if len(self.df) >= 5 else 0
+        obv_trend = self._recent_trend('obv') if len(self.df) >= 5 else 0
         if obv_trend > 0:
             votes['OBV'] = {'vote': 1, 'reason': 'OBV subiendo'}
         elif obv_trend < 0:
@@ -298,7 +518,7 @@ class TechnicalAnalyzer:
         
         # 10. Momentum (ROC)
         roc = last.get('roc', 0)
-        if not pd.isna(roc):
+        if 'roc' not in self._last_nan:
             if roc > 2:
                 votes['MOM'] = {'vote': 1, 'reason': f'Momentum positivo ({roc:.1f}%)'}
             elif roc < -2:
@@ -309,9 +529,7 @@ class TechnicalAnalyzer:
             votes['MOM'] = {'vote': 0, 'reason': 'Momentum no disponible'}
         
         # Calculate summary
-        long_votes = sum(1 for v in votes.values() if v['vote'] > 0)
-        short_votes = sum(1 for v in votes.values() if v['vote'] < 0)
-        neutral_votes = sum(1 for v in votes.values() if v['vote'] == 0)
+        long_votes, short_votes, neutral_votes = _tally_votes(votes)
         total_votes = len(votes)
         
         # Determine signal based on 7/10 rule
@@ -342,7 +560,7 @@ class TechnicalAnalyzer:
         Returns:
             Tuple of (trend_direction, score, description)
         """
-        last = self.df.iloc[-1]
+        last, prev = self._last_rows()
         current_price = last['close']
         
         score = 0
@@ -390,9 +608,9 @@ class TechnicalAnalyzer:
             signals.append("Debajo de EMA 200")
         
         # MACD analysis
-        if not pd.isna(last.get('macd')) and not pd.isna(last.get('macd_signal')):
+        if 'macd' not in self._last_nan and 'macd_signal' not in self._last_nan:
             macd_diff = last['macd'] - last['macd_signal']
-            prev_macd_diff = self.df['macd'].iloc[-2] - self.df['macd_signal'].iloc[-2]
+            prev_macd_diff = prev['macd'] - prev['macd_signal']
             
             # MACD crossover
             if macd_diff > 0 and prev_macd_diff <= 0:
@@ -427,14 +645,14 @@ class TechnicalAnalyzer:
         Returns:
             Tuple of (momentum_state, score, description)
         """
-        last = self.df.iloc[-1]
+        last, prev = self._last_rows()
         score = 0
         signals = []
         
         # RSI Analysis
         rsi = last['rsi']
         
-        if pd.isna(rsi):
+        if 'rsi' in self._last_nan:
             return "NEUTRAL", 0, "RSI no disponible"
         
         if rsi < 30:
@@ -453,8 +671,8 @@ class TechnicalAnalyzer:
             signals.append(f"RSI neutral ({rsi:.1f})")
         
         # RSI divergence check (simplified)
-        rsi_trend = self.df['rsi'].iloc[-5:].diff().mean()
-        price_trend = self.df['close'].iloc[-5:].diff().mean()
+        rsi_trend = self._recent_trend('rsi')
+        price_trend = self._recent_trend('close')
         
         if rsi_trend > 0 > price_trend:
             score += 15
@@ -467,7 +685,7 @@ class TechnicalAnalyzer:
         stoch_k = last.get('stoch_k')
         stoch_d = last.get('stoch_d')
         
-        if not pd.isna(stoch_k) and not pd.isna(stoch_d):
+        if 'stoch_k' not in self._last_nan and 'stoch_d' not in self._last_nan:
             if stoch_k < 20:
                 score += 10
                 signals.append("Stoch oversold")
@@ -476,8 +694,8 @@ class TechnicalAnalyzer:
                 signals.append("Stoch overbought")
             
             # Stochastic crossover
-            prev_k = self.df['stoch_k'].iloc[-2]
-            prev_d = self.df['stoch_d'].iloc[-2]
+            prev_k = prev['stoch_k']
+            prev_d = prev['stoch_d']
             
             if stoch_k > stoch_d and prev_k <= prev_d and stoch_k < 50:
                 score += 15
@@ -509,7 +727,7 @@ class TechnicalAnalyzer:
         Returns:
             Tuple of (volatility_state, score, description)
         """
-        last = self.df.iloc[-1]
+        last = self._last_rows()[0]
         score = 0
         signals = []
         
@@ -518,7 +736,7 @@ class TechnicalAnalyzer:
         bb_lower = last.get('bb_lower')
         bb_middle = last.get('bb_middle')
         
-        if pd.isna(bb_upper) or pd.isna(bb_lower):
+        if 'bb_upper' in self._last_nan or 'bb_lower' in self._last_nan:
             return "NEUTRAL", 0, "Bollinger Bands no disponibles"
         
         # Price position in Bollinger Bands
@@ -542,7 +760,7 @@ class TechnicalAnalyzer:
         
         # Bollinger Band squeeze (low volatility = potential breakout)
         bb_width = last['bb_width']
-        avg_bb_width = self.df['bb_width'].iloc[-20:].mean()
+        avg_bb_width = _nan_mean(self._arrays['bb_width'][-20:])
         
         if bb_width < avg_bb_width * 0.7:
             signals.append("📊 Squeeze detectado (baja volatilidad)")
@@ -567,7 +785,7 @@ class TechnicalAnalyzer:
         Returns:
             Tuple of (volume_state, score, description)
         """
-        last = self.df.iloc[-1]
+        last = self._last_rows()[0]
         score = 0
         signals = []
         
@@ -587,8 +805,8 @@ class TechnicalAnalyzer:
             signals.append("Volumen normal")
         
         # OBV trend
-        obv_trend = self.df['obv'].iloc[-5:].diff().mean()
-        price_trend = self.df['close'].iloc[-5:].diff().mean()
+        obv_trend = self._recent_trend('obv')
+        price_trend = self._recent_trend('close')
         
         if obv_trend > 0 and price_trend > 0:
             score += 10
@@ -629,68 +847,16 @@ class TechnicalAnalyzer:
         if len(self.df) < 3:
             return patterns, score
         
-        last = self.df.iloc[-1]
-        prev = self.df.iloc[-2]
-        prev2 = self.df.iloc[-3]
-        
-        # Calculate candle properties
-        last_body = abs(last['close'] - last['open'])
-        last_range = last['high'] - last['low']
-        last_upper_shadow = last['high'] - max(last['close'], last['open'])
-        last_lower_shadow = min(last['close'], last['open']) - last['low']
-        
-        prev_body = abs(prev['close'] - prev['open'])
-        
-        # Doji (indecision)
-        if last_body < last_range * 0.1:
-            patterns.append("Doji")
-        
-        # Hammer / Hanging Man (reversal)
-        if last_lower_shadow > last_body * 2 and last_upper_shadow < last_body * 0.3:
-            if prev['close'] < prev['open']:  # Downtrend
-                patterns.append("🔥 Hammer (reversal alcista)")
-                score += 15
-            else:
-                patterns.append("Hanging Man")
-                score -= 10
-        
-        # Shooting Star (bearish reversal)
-        if last_upper_shadow > last_body * 2 and last_lower_shadow < last_body * 0.3:
-            if prev['close'] > prev['open']:  # Uptrend
-                patterns.append("⚠️ Shooting Star (reversal bajista)")
-                score -= 15
-        
-        # Bullish Engulfing
-        if (prev['close'] < prev['open'] and  # Prev bearish
-            last['close'] > last['open'] and  # Current bullish
-            last['open'] < prev['close'] and  # Opens below prev close
-            last['close'] > prev['open']):    # Closes above prev open
-            patterns.append("🔥 Bullish Engulfing")
-            score += 20
-        
-        # Bearish Engulfing
-        if (prev['close'] > prev['open'] and  # Prev bullish
-            last['close'] < last['open'] and  # Current bearish
-            last['open'] > prev['close'] and  # Opens above prev close
-            last['close'] < prev['open']):    # Closes below prev open
-            patterns.append("⚠️ Bearish Engulfing")
-            score -= 20
-        
-        # Morning Star (bullish reversal - 3 candles)
-        if (prev2['close'] < prev2['open'] and  # First bearish
-            abs(prev['close'] - prev['open']) < prev_body * 0.3 and  # Small body
-            last['close'] > last['open'] and  # Third bullish
-            last['close'] > (prev2['open'] + prev2['close']) / 2):  # Closes above midpoint
-            patterns.append("🔥 Morning Star")
-            score += 25
-        
-        # Evening Star (bearish reversal - 3 candles)
-        if (prev2['close'] > prev2['open'] and  # First bullish
-            abs(prev['close'] - prev['open']) < prev_body * 0.3 and  # Small body
-            last['close'] < last['open'] and  # Third bearish
-            last['close'] < (prev2['open'] + prev2['close']) / 2):  # Closes below midpoint
-            patterns.append("⚠️ Evening Star")
-            score -= 25
+        mask = _candle_pattern_mask(
+            self.df['open'].to_numpy(dtype=np.float64),
+            self.df['high'].to_numpy(dtype=np.float64),
+            self.df['low'].to_numpy(dtype=np.float64),
+            self.df['close'].to_numpy(dtype=np.float64),
+        )
+        for bit, (name, points) in enumerate(_CANDLE_PATTERNS):
+            if mask & (1 << bit):
+                patterns.append(name)
+                score += points
         
         return patterns, score
     
@@ -723,75 +889,38 @@ class TechnicalAnalyzer:
                 'confirmed': False
             }
         
-        # Obtener las últimas N velas
-        recent_candles = self.df.iloc[-lookback:]
+        open_ = self.df['open'].to_numpy(dtype=np.float64)
+        close = self.df['close'].to_numpy(dtype=np.float64)
         
-        # Determinar color de cada vela (verde = close > open, roja = close < open)
-        colors = []
-        for _, candle in recent_candles.iterrows():
-            if candle['close'] > candle['open']:
-                colors.append('green')
-            elif candle['close'] < candle['open']:
-                colors.append('red')
-            else:
-                colors.append('neutral')
-        
-        # Generar representación visual
-        color_visual = ''
-        for c in colors:
-            if c == 'green':
-                color_visual += '🟢'
-            elif c == 'red':
-                color_visual += '🔴'
-            else:
-                color_visual += '⚪'
+        # Generar representación visual (verde = close > open, roja = close < open)
+        recent_open = open_[-lookback:]
+        recent_close = close[-lookback:]
+        color_codes = (recent_close > recent_open).astype(np.int8) - (recent_close < recent_open)
+        color_visual = ''.join([_CANDLE_EMOJI[code] for code in color_codes.tolist()])
         
         # Contar velas consecutivas del mismo color (desde la más reciente)
-        consecutive_green = 0
-        consecutive_red = 0
-        
-        # Contar verdes consecutivas desde el final
-        for c in reversed(colors):
-            if c == 'green':
-                consecutive_green += 1
-            else:
-                break
-        
-        # Si no hay verdes, contar rojas consecutivas desde el final
-        if consecutive_green == 0:
-            for c in reversed(colors):
-                if c == 'red':
-                    consecutive_red += 1
-                else:
-                    break
+        consecutive_green, consecutive_red, trend, had_opposite_before = _candle_color_loop(
+            open_, close, lookback
+        )
         
         # Detectar cambio de tendencia (3+ velas del mismo color)
         trend_change = 'NONE'
         confirmed = False
-        description = 'Sin confirmación de cambio'
-        
-        if consecutive_green >= 3:
-            # Verificar si hubo velas rojas antes (cambio de tendencia)
-            had_red_before = any(c == 'red' for c in colors[:-consecutive_green])
-            if had_red_before:
-                trend_change = 'BULLISH'
-                confirmed = True
+        
+        if trend == 1:
+            trend_change = 'BULLISH'
+            confirmed = True
+            if had_opposite_before:
                 description = f'✅ {consecutive_green} velas VERDES → Cambio a ALCISTA'
             else:
-                trend_change = 'BULLISH'
-                confirmed = True
                 description = f'📈 {consecutive_green} velas VERDES consecutivas'
         
-        elif consecutive_red >= 3:
-            # Verificar si hubo velas verdes antes (cambio de tendencia)
-            had_green_before = any(c == 'green' for c in colors[:-consecutive_red])
-            if had_green_before:
-                trend_change = 'BEARISH'
-                confirmed = True
+        elif trend == -1:
+            trend_change = 'BEARISH'
+            confirmed = True
+            if had_opposite_before:
                 description = f'✅ {consecutive_red} velas ROJAS → Cambio a BAJISTA'
             else:
-                trend_change = 'BEARISH'
-                confirmed = True
                 description = f'📉 {consecutive_red} velas ROJAS consecutivas'
         
         else:
@@ -822,8 +951,7 @@ class TechnicalAnalyzer:
             - moving_averages: {votes, long_count, short_count, neutral_count, signal}
             - summary: Overall signal (only STRONG if both groups agree)
         """
-        last = self.df.iloc[-1]
-        prev = self.df.iloc[-2] if len(self.df) > 1 else last
+        last, prev = self._last_rows()
         
         oscillator_votes = {}
         ma_votes = {}
@@ -832,7 +960,7 @@ class TechnicalAnalyzer:
         
         # 1. RSI (Relative Strength Index)
         rsi = last['rsi']
-        if not pd.isna(rsi):
+        if 'rsi' not in self._last_nan:
             if rsi < 30:
                 oscillator_votes['RSI'] = {'vote': 1, 'reason': f'RSI sobreventa ({rsi:.0f})'}
             elif rsi > 70:
@@ -847,7 +975,7 @@ class TechnicalAnalyzer:
         # 2. Stochastic %K
         stoch_k = last.get('stoch_k')
         stoch_d = last.get('stoch_d')
-        if not pd.isna(stoch_k) and not pd.isna(stoch_d):
+        if 'stoch_k' not in self._last_nan and 'stoch_d' not in self._last_nan:
             if stoch_k < 20:
                 oscillator_votes['STOCH'] = {'vote': 1, 'reason': f'Stoch sobreventa ({stoch_k:.0f})'}
             elif stoch_k > 80:
@@ -860,7 +988,7 @@ class TechnicalAnalyzer:
             oscillator_votes['STOCH'] = {'vote': 0, 'reason': 'Stoch no disponible'}
         
         # 3. MACD Level
-        if not pd.isna(last['macd']) and not pd.isna(last['macd_signal']):
+        if 'macd' not in self._last_nan and 'macd_signal' not in self._last_nan:
             macd_diff = last['macd'] - last['macd_signal']
             if macd_diff > 0:
                 oscillator_votes['MACD'] = {'vote': 1, 'reason': 'MACD alcista'}
@@ -883,7 +1011,7 @@ class TechnicalAnalyzer:
         
         # 5. Momentum (ROC - Rate of Change)
         roc = last.get('roc', 0)
-        if not pd.isna(roc):
+        if 'roc' not in self._last_nan:
             if roc > 2:
                 oscillator_votes['MOM'] = {'vote': 1, 'reason': f'Momentum positivo ({roc:.1f}%)'}
             elif roc < -2:
@@ -894,7 +1022,7 @@ class TechnicalAnalyzer:
             oscillator_votes['MOM'] = {'vote': 0, 'reason': 'Momentum no disponible'}
         
         # 6. Bull Bear Power (using OBV as proxy)
-        obv_trend = self.df['obv'].iloc[-5:].diff().mean() if len(self.df) >= 5 else 0
+        obv_trend = self._recent_trend('obv') if len(self.df) >= 5 else 0
         if obv_trend > 0:
             oscillator_votes['BBP'] = {'vote': 1, 'reason': 'OBV subiendo'}
         elif obv_trend < 0:
@@ -921,7 +1049,7 @@ class TechnicalAnalyzer:
             ma_votes['MA25'] = {'vote': 0, 'reason': 'Precio en MA25'}
         
         # 3. MA99 - Price vs MA99
-        if not pd.isna(last['ma_99']):
+        if 'ma_99' not in self._last_nan:
             if last['close'] > last['ma_99']:
                 ma_votes['MA99'] = {'vote': 1, 'reason': 'Precio arriba de MA99'}
             elif last['close'] < last['ma_99']:
@@ -958,9 +1086,7 @@ class TechnicalAnalyzer:
         # ========== CALCULATE SUMMARIES ==========
         
         # Oscillators summary
-        osc_long = sum(1 for v in oscillator_votes.values() if v['vote'] > 0)
-        osc_short = sum(1 for v in oscillator_votes.values() if v['vote'] < 0)
-        osc_neutral = sum(1 for v in oscillator_votes.values() if v['vote'] == 0)
+        osc_long, osc_short, osc_neutral = _tally_votes(oscillator_votes)
         
         if osc_long >= 5:
             osc_signal = 'STRONG_BUY'
@@ -974,9 +1100,7 @@ class TechnicalAnalyzer:
             osc_signal = 'NEUTRAL'
         
         # Moving Averages summary
-        ma_long = sum(1 for v in ma_votes.values() if v['vote'] > 0)
-        ma_short = sum(1 for v in ma_votes.values() if v['vote'] < 0)
-        ma_neutral = sum(1 for v in ma_votes.values() if v['vote'] == 0)
+        ma_long, ma_short, ma_neutral = _tally_votes(ma_votes)
         
         if ma_long >= 5:
             ma_signal = 'STRONG_BUY'
@@ -1033,6 +1157,18 @@ class TechnicalAnalyzer:
         }
 
     
+    def _rounded_indicators(self, last: dict) -> Dict:
+        """
+        Last indicator values for the analysis dict, rounded with one np.round
+        per precision; nullable fields are None when the value is NaN
+        """
+        values = np.array([last[col] for col, _, _ in _INDICATOR_FIELDS], dtype=np.float64)
+        rounded = {2: np.round(values, 2), 4: np.round(values, 4)}
+        return {
+            col: None if nullable and col in self._last_nan else rounded[decimals][i]
+            for i, (col, decimals, nullable) in enumerate(_INDICATOR_FIELDS)
+        }
+    
     def generate_analysis(self) -> Dict:
         """
         Generate complete technical analysis with scoring system
@@ -1040,7 +1176,7 @@ class TechnicalAnalyzer:
         Returns:
             Dictionary with complete analysis results
         """
-        # Calculate all indicators first
+        # Calculate all indicators first (no-op if the caller already did)
         self.calculate_all_indicators()
         
         # Analyze each component
@@ -1075,11 +1211,11 @@ class TechnicalAnalyzer:
             signal = SignalType.NEUTRAL
         
         # Get current price data
-        last = self.df.iloc[-1]
+        last = self._last_rows()[0]
         
         return {
             'price': last['close'],
-            'timestamp': last.name,
+            'timestamp': self.df.index[-1],
             'score': round(total_score, 1),
             'signal': signal,
             'trend': {
@@ -1103,19 +1239,7 @@ class TechnicalAnalyzer:
                 'description': volume_desc
             },
             'patterns': patterns,
-            'indicators': {
-                'rsi': round(last['rsi'], 2) if not pd.isna(last['rsi']) else None,
-                'macd': round(last['macd'], 4) if 'macd' in last and not pd.isna(last['macd']) else None,
-                'macd_signal': round(last['macd_signal'], 4) if 'macd_signal' in last and not pd.isna(last['macd_signal']) else None,
-                'ema_9': round(last['ema_9'], 2),
-                'ema_21': round(last['ema_21'], 2),
-                'ema_50': round(last['ema_50'], 2),
-                'ema_200': round(last['ema_200'], 2),
-                'bb_upper': round(last['bb_upper'], 2) if 'bb_upper' in last and not pd.isna(last['bb_upper']) else None,
-                'bb_lower': round(last['bb_lower'], 2) if 'bb_lower' in last and not pd.isna(last['bb_lower']) else None,
-                'volume_ratio': round(last['volume_ratio'], 2) if 'volume_ratio' in last else None,
-                'adx': round(last['adx'], 2) if 'adx' in last else 0,
-            }
+            'indicators': self._rounded_indicators(last),
         }
 
 
@@ -1135,5 +1259,50 @@ def analyze_symbol(symbol: str, timeframe: str = None) -> Dict:
     client = get_client()
     df = client.get_ohlcv(symbol, timeframe)
     
+    # The last candle is still forming: key on its full row, not just its timestamp
+    key = (symbol, timeframe, len(df), tuple(df.iloc[-1].tolist())) if len(df) else None
+    if key is not None:
+        with _analysis_cache_lock:
+            cached = _analysis_cache.get(key)
+            if cached is not None:
+                _analysis_cache.move_to_end(key)
+                return copy.deepcopy(cached)
+    
     analyzer = TechnicalAnalyzer(df)
-    return analyzer.generate_analysis()
+    analysis = analyzer.generate_analysis()
+    
+    if key is not None:
+        with _analysis_cache_lock:
+            _analysis_cache[key] = copy.deepcopy(analysis)
+            _analysis_cache.move_to_end(key)
+            if len(_analysis_cache) > _ANALYSIS_CACHE_MAXSIZE:
+                _analysis_cache.popitem(last=False)
+    return analysis
+
+
+def analyze_symbols(symbols: List[str], timeframe: str = None,
+                    max_workers: int = _BATCH_MAX_WORKERS) -> Dict[str, Dict]:
+    """
+    Analyze many symbols concurrently (fetch + indicators per thread)
+    
+    Args:
+        symbols: Trading pairs to analyze
+        timeframe: Timeframe for analysis
+        max_workers: Concurrent analyses (keep within exchange rate limits)
+        
+    Returns:
+        {symbol: analysis} in the order of symbols; failed symbols are skipped
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (symbol, executor.submit(analyze_symbol, symbol, timeframe))
+            for symbol in symbols
+        ]
+    
+    results = {}
+    for symbol, future in futures:
+        try:
+            results[symbol] = future.result()
+        except _TIMEFRAME_ERRORS as e:
+            logger.warning("Technical analysis unavailable for %s: %s", symbol, e)
+    return results
@@ -7,9 +7,10 @@ import pandas as pd
 from datetime import datetime
 import os
 import time
+import orjson
 from src.binance_client import get_client
 from src.feature_engineering import FeatureEngineer
-from src.ml_engine import MLEngine
+from src.ml_engine import MLEngine, _METADATA_JSON_OPTIONS
 from src.ml_config import MLConfig
 
 
@@ -92,19 +93,16 @@ def train_single_model(symbol: str, timeframe: str, days: int) -> dict:
         os.makedirs(symbol_dir, exist_ok=True)
         
         # Save model files
-        ml_engine.model.save_model(os.path.join(symbol_dir, 'model.txt'))
+        ml_engine.model.save_model(os.path.join(symbol_dir, 'model.txt'),
+                                   num_iteration=ml_engine.model.best_iteration)
         
-        import joblib
-        import json
-        joblib.dump(ml_engine.scaler, os.path.join(symbol_dir, 'scaler.pkl'))
-        
-        with open(os.path.join(symbol_dir, 'feature_names.json'), 'w') as f:
-            json.dump(ml_engine.feature_names, f)
+        with open(os.path.join(symbol_dir, 'feature_names.json'), 'wb') as f:
+            f.write(orjson.dumps(ml_engine.feature_names))
         
         metrics['symbol'] = symbol
         metrics['timeframe'] = timeframe
-        with open(os.path.join(symbol_dir, 'metadata.json'), 'w') as f:
-            json.dump(metrics, f, indent=2)
+        with open(os.path.join(symbol_dir, 'metadata.json'), 'wb') as f:
+            f.write(orjson.dumps(metrics, option=_METADATA_JSON_OPTIONS))
         
         print(f"\n✅ Model saved to: {symbol_dir}")
         print(f"   Accuracy: {metrics['val_accuracy']:.2%}")